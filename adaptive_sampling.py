@@ -0,0 +1,128 @@
+import math
+import time
+from statistics import NormalDist
+
+
+class AdaptiveConfig:
+    """When to stop sampling an endpoint's latency.
+
+    Sampling continues until the ``confidence`` interval of the ``quantile``
+    latency (50 for the median, 95 for p95) is no wider than ``rel_width``
+    of the estimate, or until ``max_samples`` or ``time_budget`` seconds run
+    out. At least ``min_samples`` are always taken, and ``max_samples`` is
+    raised to bounded_sample_count() when it is too small for the interval
+    to exist at all (35 for p90, 73 for p95, 381 for p99 at 95%).
+    """
+
+    def __init__(self, quantile=50, rel_width=0.10, confidence=0.95, min_samples=3, max_samples=50,
+                 time_budget=15.0):
+        if not 0 < quantile < 100:
+            raise ValueError("quantile must be between 0 and 100")
+        self.quantile = quantile
+        self.rel_width = rel_width
+        self.confidence = confidence
+        self.min_samples = max(2, min_samples)
+        self.max_samples = max(self.min_samples, max_samples, bounded_sample_count(quantile, confidence))
+        self.time_budget = time_budget
+
+
+class SamplingReport:
+    def __init__(self, config, estimate, low, high, bounded, samples, converged, reason):
+        self.config = config
+        self.estimate = estimate
+        self.low = low
+        self.high = high
+        self.bounded = bounded
+        self.samples = samples
+        self.converged = converged
+        self.reason = reason
+
+    @property
+    def rel_width(self):
+        if self.estimate is None or not self.estimate:
+            return None
+        return (self.high - self.low) / self.estimate
+
+    def as_dict(self):
+        return {"quantile": self.config.quantile, "confidence": self.config.confidence, "estimate": self.estimate,
+                "low": self.low, "high": self.high, "bounded": self.bounded, "samples": self.samples,
+                "converged": self.converged, "reason": self.reason}
+
+    def summary(self):
+        if self.estimate is None:
+            return f"no successful samples ({self.reason})"
+        status = "converged" if self.converged else f"stopped: {self.reason}"
+        if not self.bounded:
+            return (f"p{self.config.quantile:g} {self.estimate:.1f} ms, too few samples for a "
+                    f"{self.config.confidence:.0%} CI ({self.samples} samples, {status})")
+        return (f"p{self.config.quantile:g} {self.estimate:.1f} ms, {self.config.confidence:.0%} CI "
+                f"{self.low:.1f}-{self.high:.1f} ms (±{self.rel_width / 2:.1%}) from {self.samples} samples, {status}")
+
+
+def quantile_interval(sorted_values, quantile, confidence):
+    """Distribution-free confidence interval for a latency quantile.
+
+    Uses the order statistics whose ranks bracket n*q by z*sqrt(n*q*(1-q))
+    (the normal approximation to the binomial), so no assumption is made
+    about the shape of the latency distribution. Returns (estimate, low, high,
+    bounded); ``bounded`` is False while there are too few samples for a rank
+    to exist on one side (e.g. under 8 samples for a 95% median interval), in
+    which case the interval falls back to the observed range.
+    """
+    n = len(sorted_values)
+    q = quantile / 100
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    spread = z * math.sqrt(n * q * (1 - q))
+    low_rank = math.floor(n * q - spread)
+    high_rank = math.ceil(n * q + spread)
+    estimate = sorted_values[min(n - 1, max(0, math.ceil(n * q) - 1))]
+    low = sorted_values[max(0, low_rank - 1)]
+    high = sorted_values[min(n - 1, high_rank - 1)]
+    return estimate, low, high, low_rank >= 1 and high_rank <= n
+
+
+def bounded_sample_count(quantile, confidence):
+    """Fewest samples for which quantile_interval gives a bounded interval."""
+    q = quantile / 100
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    n = 1
+    while True:
+        spread = z * math.sqrt(n * q * (1 - q))
+        if math.floor(n * q - spread) >= 1 and math.ceil(n * q + spread) <= n:
+            return n
+        n += 1
+
+
+def sample_until_converged(probe, config, cancel=None):
+    """Call ``probe()`` until the latency estimate is tight enough.
+
+    ``probe`` returns a ProbeResult; failed and throttled probes count
+    against the sample budget but not towards the estimate. Returns (samples, SamplingReport).
+    """
+    samples = []
+    latencies = []
+    start = time.perf_counter()
+    reason = "sample budget"
+    while len(samples) < config.max_samples:
+        if cancel and cancel.is_set():
+            reason = "cancelled"
+            break
+        if time.perf_counter() - start >= config.time_budget:
+            reason = "time budget"
+            break
+
+        result = probe()
+        samples.append(result)
+        if not result.failed and not result.throttled:
+            latencies.append(result.elapsed_ms)
+            latencies.sort()
+
+        if len(latencies) >= config.min_samples:
+            estimate, low, high, bounded = quantile_interval(latencies, config.quantile, config.confidence)
+            if bounded and estimate and (high - low) / estimate <= config.rel_width:
+                return samples, SamplingReport(config, estimate, low, high, True, len(samples), True, "converged")
+
+    if not latencies:
+        return samples, SamplingReport(config, None, None, None, False, len(samples), False, reason)
+    estimate, low, high, bounded = quantile_interval(latencies, config.quantile, config.confidence)
+    return samples, SamplingReport(config, estimate, low, high, bounded, len(samples), False, reason)
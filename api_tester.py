@@ -1,48 +1,45 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import requests
-import time
 import threading
 import json
+import time
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-SECURITY_HEADERS = [
-    "Strict-Transport-Security",
-    "Content-Security-Policy",
-    "X-Content-Type-Options",
-    "X-Frame-Options",
-]
-
-test_history = []
-
-sample_apis = {
-    "https://reqres.in/api/users": "GET",
-    "https://jsonplaceholder.typicode.com/posts": "GET",
-    "https://jsonplaceholder.typicode.com/comments": "GET",
-    "https://reqres.in/api/users/2": "GET",
-    "https://api.openweathermap.org/data/2.5/weather?q=London&appid=demo": "GET",
-    "https://gorest.co.in/public/v2/users": "GET",
-    "https://petstore.swagger.io/v2/pet": "GET",
-    "https://api.agify.io?name=michael": "GET",
-    "https://api.genderize.io?name=lucy": "GET",
-    "https://api.nationalize.io?name=nathaniel": "GET",
-    "https://dog.ceo/api/breeds/image/random": "GET",
-    "https://catfact.ninja/fact": "GET",
-    "https://official-joke-api.appspot.com/random_joke": "GET",
-    "https://randomuser.me/api/": "GET",
-    "https://jsonplaceholder.typicode.com/posts": "POST",
-    "https://jsonplaceholder.typicode.com/posts/1": "PUT",
-    "https://jsonplaceholder.typicode.com/posts/1": "DELETE"
+from phase_timing import format_phases
+from probe_engine import ProbeEngine, format_transfer, run_probe_suite, sample_apis
+from load_test import LoadConfig, run_load_suite
+from load_profiles import constant, ramp, run_profile_suite, spike, step
+from adaptive_sampling import AdaptiveConfig
+from result_store import ResultStore, record_from_results
+from ui_events import BoundedLog, EventPump
+
+# How often worker events are drained into the UI, and how much report text is kept
+EVENT_INTERVAL_MS = 50
+REPORT_MAX_LINES = 2000
+# Open-loop profiles, built from the Target RPS (peak) and Duration fields
+LOAD_PROFILES = {
+    "Closed loop": None,
+    "Constant": lambda rps, duration: constant(rps, duration),
+    "Ramp": lambda rps, duration: ramp(rps / 10, rps, duration),
+    "Step": lambda rps, duration: step(rps / 5, rps, 5, duration / 5),
+    "Spike": lambda rps, duration: spike(rps / 5, rps, duration * 0.4, duration * 0.2),
 }
 
+# Response body handling: how many bytes to stream per probe (None reads it all)
+BODY_MODES = {"Full body (streamed)": None, "Headers only": 0, "First 64 KB": 64 * 1024, "First 1 MB": 1024 * 1024}
+HISTORY_PAGE_SIZE = 50
+HISTORY_RANGES = {"All time": None, "Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400}
+
 class APITester(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("🚀 API Testing Tool")
         self.geometry("1200x800")
         self.is_dark = True
+        self.engine = ProbeEngine()
+        self.store = ResultStore()
+        self.score_chart = None
+        self.latency_chart = None
+        self.cancel_event = threading.Event()
 
         self.style = ttk.Style(self)
         self.set_theme()
@@ -50,6 +47,17 @@ class APITester(tk.Tk):
         self.create_widgets()
         self.bind("<Configure>", self.on_resize)
 
+        self.report_log = BoundedLog(self.report_area, REPORT_MAX_LINES)
+        self.events = EventPump(self, {
+            "report": self.report_log.append,
+            "error": lambda errors: [messagebox.showerror(*e) for e in errors],
+            "samples": lambda samples: self.latency_chart.add_samples(samples),
+            "load_started": lambda _: self.start_latency_view(),
+            "scores": lambda scores: self.show_graph(scores[-1]),
+            "done": lambda _: self.reset_ui(),
+        }, EVENT_INTERVAL_MS, on_error=self.show_event_error)
+        self.events.start()
+
     def set_theme(self):
         theme = {
             "dark": {
@@ -86,17 +94,35 @@ class APITester(tk.Tk):
         fg = "white" if self.is_dark else "black"
         self.json_text.config(bg=bg, fg=fg, insertbackground=fg)
         self.report_area.config(bg=bg, fg=fg, insertbackground=fg)
+        self.update_chart_colors()
+
+    def chart_colors(self):
+        # Theme-based styling
+        if self.is_dark:
+            return "#1A1A2E", "white", "green"
+        return "white", "black", "#4CAF50"  # Default green for light theme
+
+    def update_chart_colors(self):
+        bg_color, text_color, bar_color = self.chart_colors()
+        if self.score_chart:
+            self.score_chart.set_colors(bg_color, text_color, bar_color)
+        if self.latency_chart:
+            self.latency_chart.set_colors(bg_color, text_color, "#00FFAB" if self.is_dark else "#0078D7")
 
     def create_widgets(self):
         self.main_frame = ttk.Frame(self, padding=15)
         self.main_frame.pack(fill="both", expand=True)
 
         self.main_frame.columnconfigure(1, weight=1)
-        self.main_frame.rowconfigure(7, weight=1)
+        self.main_frame.rowconfigure(8, weight=1)
 
         ttk.Label(self.main_frame, text="🔽 Choose API:").grid(row=0, column=0, sticky="w")
         self.api_var = tk.StringVar()
-        self.api_menu = ttk.Combobox(self.main_frame, textvariable=self.api_var, values=list(sample_apis.keys()), width=65)
+        # A URL sampled with several methods is listed once and preselects the first of them
+        self.sample_methods = {}
+        for api_url, api_method in sample_apis:
+            self.sample_methods.setdefault(api_url, api_method)
+        self.api_menu = ttk.Combobox(self.main_frame, textvariable=self.api_var, values=list(self.sample_methods), width=65)
         self.api_menu.grid(row=0, column=1, columnspan=2, sticky="we")
         self.api_menu.bind("<<ComboboxSelected>>", self.on_api_selected)
 
@@ -116,6 +142,10 @@ class APITester(tk.Tk):
         self.auth_check = ttk.Checkbutton(self.main_frame, text="Use Auth", variable=self.auth_var)
         self.auth_check.grid(row=2, column=2, sticky="e")
 
+        self.body_var = tk.StringVar(value="Full body (streamed)")
+        self.body_menu = ttk.Combobox(self.main_frame, textvariable=self.body_var, values=list(BODY_MODES), state="readonly", width=20)
+        self.body_menu.grid(row=2, column=3, sticky="e")
+
         ttk.Label(self.main_frame, text="🔑 Token/Auth (Bearer or Basic):").grid(row=3, column=0, sticky="w")
         self.token_entry = ttk.Entry(self.main_frame, width=65)
         self.token_entry.grid(row=3, column=1, columnspan=3, sticky="we")
@@ -124,20 +154,47 @@ class APITester(tk.Tk):
         self.json_text = scrolledtext.ScrolledText(self.main_frame, height=5, width=80, wrap=tk.WORD)
         self.json_text.grid(row=4, column=1, columnspan=3, sticky="we")
 
-        self.test_button = ttk.Button(self.main_frame, text="🚀 Test API", command=self.run_tests)
-        self.test_button.grid(row=5, column=0, columnspan=4, pady=5)
+        self.load_var = tk.BooleanVar()
+        self.load_check = ttk.Checkbutton(self.main_frame, text="Load Test", variable=self.load_var)
+        self.load_check.grid(row=5, column=0, sticky="w")
+
+        self.load_frame = ttk.Frame(self.main_frame)
+        self.load_frame.grid(row=5, column=1, columnspan=3, sticky="w")
+        self.load_entries = {}
+        for col, (key, label, default) in enumerate([("workers", "Workers:", "10"), ("total_requests", "Requests:", "100"),
+                                                     ("duration", "Duration (s):", ""), ("target_rps", "Target RPS:", ""),
+                                                     ("processes", "Processes:", "1")]):
+            ttk.Label(self.load_frame, text=label).grid(row=0, column=col * 2, padx=(0, 4), sticky="w")
+            entry = ttk.Entry(self.load_frame, width=7)
+            entry.insert(0, default)
+            entry.grid(row=0, column=col * 2 + 1, padx=(0, 10), sticky="w")
+            self.load_entries[key] = entry
+        self.profile_var = tk.StringVar(value="Closed loop")
+        self.profile_menu = ttk.Combobox(self.load_frame, textvariable=self.profile_var, values=list(LOAD_PROFILES),
+                                         state="readonly", width=12)
+        self.profile_menu.grid(row=0, column=10, sticky="w")
+
+        self.button_frame = ttk.Frame(self.main_frame)
+        self.button_frame.grid(row=6, column=0, columnspan=4, pady=5)
+        self.adaptive_var = tk.BooleanVar(value=True)
+        self.adaptive_check = ttk.Checkbutton(self.button_frame, text="Adaptive sampling", variable=self.adaptive_var)
+        self.adaptive_check.pack(side="left", padx=5)
+        self.test_button = ttk.Button(self.button_frame, text="🚀 Test API", command=self.run_tests)
+        self.test_button.pack(side="left", padx=5)
+        self.cancel_button = ttk.Button(self.button_frame, text="⛔ Cancel", command=self.cancel_tests, state=tk.DISABLED)
+        self.cancel_button.pack(side="left", padx=5)
 
         self.progress = ttk.Progressbar(self.main_frame, mode="indeterminate")
-        self.progress.grid(row=6, column=0, columnspan=4, sticky="we")
+        self.progress.grid(row=7, column=0, columnspan=4, sticky="we")
 
         self.report_area = scrolledtext.ScrolledText(self.main_frame, wrap=tk.WORD, width=100, height=15, font=("Courier", 12))
-        self.report_area.grid(row=7, column=0, columnspan=4, pady=10, sticky="nsew")
+        self.report_area.grid(row=8, column=0, columnspan=4, pady=10, sticky="nsew")
 
         self.history_button = ttk.Button(self.main_frame, text="📜 View Past Results", command=self.show_history)
-        self.history_button.grid(row=8, column=0, sticky="w")
+        self.history_button.grid(row=9, column=0, sticky="w")
 
         self.canvas_frame = ttk.Frame(self.main_frame)
-        self.canvas_frame.grid(row=9, column=0, columnspan=4, pady=10, sticky="nsew")
+        self.canvas_frame.grid(row=10, column=0, columnspan=4, pady=10, sticky="nsew")
 
         self.update_all_colors()
 
@@ -149,16 +206,11 @@ class APITester(tk.Tk):
         selected_api = self.api_var.get()
         self.url_entry.delete(0, tk.END)
         self.url_entry.insert(0, selected_api)
-        if selected_api in sample_apis:
-            self.method_var.set(sample_apis[selected_api])
+        if selected_api in self.sample_methods:
+            self.method_var.set(self.sample_methods[selected_api])
 
     def run_tests(self):
-        self.test_button.config(state=tk.DISABLED)
-        self.progress.start()
-        self.report_area.delete(1.0, tk.END)
-        threading.Thread(target=self.perform_tests, daemon=True).start()
-
-    def perform_tests(self):
+        # Read and validate the form here, on the Tk thread; the worker only gets plain values
         url = self.url_entry.get().strip()
         method = self.method_var.get().strip().upper()
         headers = {}
@@ -170,118 +222,196 @@ class APITester(tk.Tk):
         if method in ["POST", "PUT"]:
             try:
                 data = json.loads(self.json_text.get("1.0", tk.END).strip())
-            except:
+            except ValueError:
                 messagebox.showerror("JSON Error", "Invalid JSON format.")
-                self.reset_ui()
                 return
 
         if not url:
             messagebox.showerror("⚠ Error", "Please enter an API URL.")
-            self.reset_ui()
             return
 
-        self.append_report(f"🌍 Testing API: {url} ({method})\n\n")
-
-        functionality = self.test_functionality(url, method, headers, data)
-        reliability, avg_time = self.test_reliability(url, method, headers, data)
-        security = self.test_security(url, method, headers, data)
-        performance = max(0, 100 - avg_time / 10)
-        performance = round(performance, 2)
-
-        self.append_report("\n✅ API testing complete.\n")
-        self.append_report(f"🛠 Functionality Score: {functionality}/100\n")
-        self.append_report(f"🔄 Reliability Score: {reliability}/100 (Avg: {avg_time:.2f} ms)\n")
-        self.append_report(f"🚀 Performance Score: {performance}/100\n")
-        self.append_report(f"🔒 Security Score: {security}/100\n")
-
-        test_history.append({
-            "Time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "URL": url,
-            "Method": method,
-            "Functionality Score": functionality,
-            "Reliability Score": reliability,
-            "Performance Score": performance,
-            "Security Score": security
-        })
-
-        self.after(0, self.show_graph, [functionality, reliability, performance, security])
-        self.reset_ui()
-
-    def test_functionality(self, url, method, headers, data):
-        try:
-            response = requests.request(method, url, headers=headers, json=data)
-            return 100 if response.status_code == 200 else 50
-        except:
-            return 0
-
-    def test_reliability(self, url, method, headers, data):
-        response_times = []
-        for _ in range(3):
+        load_config, stages = None, None
+        if self.load_var.get():
             try:
-                start = time.time()
-                requests.request(method, url, headers=headers, json=data)
-                response_times.append((time.time() - start) * 1000)
-            except:
-                response_times.append(None)
-
-        avg_time = sum(filter(None, response_times)) / len(response_times) if response_times else 1000
-        reliability_score = max(0, 100 - avg_time / 10)
-        return round(reliability_score, 2), avg_time
+                load_config, stages = self.read_load_config()
+            except ValueError:
+                messagebox.showerror("⚠ Error", "Load settings must be numbers, with Requests or Duration set. "
+                                               "Open-loop profiles need Target RPS and Duration.")
+                return
 
-    def test_security(self, url, method, headers, data):
+        self.engine.body_cap = BODY_MODES[self.body_var.get()]
+        self.cancel_event.clear()
+        self.test_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress.start()
+        self.report_log.clear()
+        adaptive = AdaptiveConfig() if self.adaptive_var.get() else None
+        threading.Thread(target=self.perform_tests, args=(url, method, headers, data, load_config, stages, adaptive),
+                         daemon=True).start()
+
+    def cancel_tests(self):
+        self.cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.append_report("\n⛔ Cancelling, waiting for in-flight requests...\n")
+
+    def perform_tests(self, url, method, headers, data, load_config, stages, adaptive):
+        # Runs on a worker thread: talk to the UI only through self.events
         try:
-            response = requests.request(method, url, headers=headers, json=data)
-            https_check = 100 if url.startswith("https://") else 50
-            headers_score = sum(25 for header in SECURITY_HEADERS if header in response.headers)
-            return min(100, https_check + headers_score)
-        except:
-            return 0
-
-    def show_graph(self, scores):
-        for widget in self.canvas_frame.winfo_children():
-            widget.destroy()
+            self.append_report(f"🌍 Testing API: {url} ({method})\n\n")
+
+            if stages:
+                self.events.post("load_started")
+                results = run_profile_suite(self.engine, url, method, headers, data, stages, load_config.workers,
+                                            on_sample=self.queue_profile_sample, cancel=self.cancel_event)
+            elif load_config:
+                self.events.post("load_started")
+                results = run_load_suite(self.engine, url, method, headers, data, load_config,
+                                         on_sample=self.queue_sample, cancel=self.cancel_event)
+            else:
+                results = run_probe_suite(self.engine, url, method, headers, data, cancel=self.cancel_event,
+                                          adaptive=adaptive)
+
+            if self.cancel_event.is_set():
+                self.append_report("⛔ Run cancelled, results discarded.\n")
+                return
 
-        labels = ["Functionality", "Reliability", "Performance", "Security"]
+            functionality = results["functionality"]
+            reliability, avg_time = results["reliability"], results["avg_time"]
+            performance = results["performance"]
+            security = results["security"]
+
+            self.append_report("\n✅ API testing complete.\n")
+            self.append_report(f"🛠 Functionality Score: {functionality}/100\n")
+            self.append_report(f"🔄 Reliability Score: {reliability}/100 (Avg: {avg_time:.2f} ms)\n")
+            self.append_report(f"🚀 Performance Score: {performance}/100\n")
+            self.append_report(f"🔒 Security Score: {security}/100\n")
+            if "load" in results:
+                self.append_report(f"📈 Load: {results['load'].summary()}\n")
+            if results.get("profile"):
+                for stage in results["profile"].stages:
+                    self.append_report(f"📶 {stage.summary()}\n")
+            if results.get("sampling"):
+                self.append_report(f"🎯 Sampling: {results['sampling'].summary()}\n")
+            if results.get("throttled"):
+                self.append_report(f"🚦 Throttled: {results['throttled']} responses (429/503) left out of the scores\n")
+
+            phases = results["phases"]
+            self.append_report(f"⏱ First request: {format_phases(phases['cold'])}\n")
+            if phases["warm"]:
+                self.append_report(f"⏱ Warm average: {format_phases(phases['warm'])}\n")
+            if results["transfer"]:
+                self.append_report(f"📦 Body: {format_transfer(results['transfer'])}\n")
+
+            self.store.add(record_from_results(url, method, results))
+            self.events.post("scores", [functionality, reliability, performance, security])
+        except Exception as exc:
+            self.events.post("error", ("⚠ Error", f"Test run failed: {exc}"))
+        finally:
+            self.events.post("done")
+
+    def read_load_config(self):
+        values = {}
+        for key, entry in self.load_entries.items():
+            text = entry.get().strip()
+            values[key] = float(text) if text else None
+        config = LoadConfig(workers=int(values["workers"] or 1),
+                            total_requests=int(values["total_requests"]) if values["total_requests"] else None,
+                            duration=values["duration"], target_rps=values["target_rps"],
+                            processes=int(values["processes"]) if values["processes"] is not None else 1)
+        build_profile = LOAD_PROFILES[self.profile_var.get()]
+        if build_profile is None:
+            return config, None
+        if not values["target_rps"] or not values["duration"]:
+            raise ValueError("open-loop profiles need a target RPS and a duration")
+        return config, build_profile(values["target_rps"], values["duration"])
 
-        # Theme-based styling
-        if self.is_dark:
-            bg_color = "#1A1A2E"
-            text_color = "white"
-            bar_color = "green"
-        else:
-            bg_color = "white"
-            text_color = "black"
-            bar_color = "#4CAF50"  # Default green for light theme
-
-        fig, ax = plt.subplots(figsize=(6, 4))
-        fig.patch.set_facecolor(bg_color)
-        ax.set_facecolor(bg_color)
-        ax.bar(labels, scores, color=bar_color)
-
-        ax.set_ylabel("Score (0-100)", color=text_color)
-        ax.set_title("API Test Scores", color=text_color)
-        ax.set_ylim([0, 100])
-        ax.tick_params(axis='x', colors=text_color)
-        ax.tick_params(axis='y', colors=text_color)
-
-        canvas = FigureCanvasTkAgg(fig, master=self.canvas_frame)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        canvas.draw()
+    def show_graph(self, scores):
+        if self.score_chart is None:
+            # matplotlib is only loaded once there is a chart to draw
+            from charts import ScoreChart
+            self.score_chart = ScoreChart(self.canvas_frame)
+            self.update_chart_colors()
+        self.score_chart.update(scores)
+
+    def start_latency_view(self):
+        if self.latency_chart is None:
+            from charts import LatencyChart
+            self.latency_chart = LatencyChart(self.canvas_frame)
+            self.update_chart_colors()
+        self.latency_chart.reset()
+
+    def queue_sample(self, offset, sample):
+        # Called on load worker threads
+        if sample.ok:
+            self.events.post("samples", (offset, sample.elapsed_ms))
+
+    def queue_profile_sample(self, offset, sample, latency):
+        # Open-loop samples are plotted at their scheduled time with the corrected latency
+        if sample.ok:
+            self.events.post("samples", (offset, latency))
 
     def append_report(self, text):
-        self.report_area.insert(tk.END, text)
-        self.report_area.see(tk.END)
+        # Safe from any thread; lines are batched into the report by the event pump
+        self.events.post("report", text)
 
     def reset_ui(self):
         self.test_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
         self.progress.stop()
 
+    def show_event_error(self, kind, exc):
+        # e.g. the chart failing to load matplotlib; the run itself carries on
+        messagebox.showerror("⚠ Error", f"Could not show {kind}: {exc}")
+
     def show_history(self):
-        hist_text = ""
-        for h in test_history:
-            hist_text += f"{h['Time']} | {h['Method']} | {h['URL']}\n"
-            hist_text += f"Functionality: {h['Functionality Score']} | Reliability: {h['Reliability Score']} | Performance: {h['Performance Score']} | Security: {h['Security Score']}\n\n"
-        messagebox.showinfo("📜 Past Results", hist_text or "No past results yet.")
+        HistoryWindow(self, self.store)
+
+
+class HistoryWindow(tk.Toplevel):
+    """Paged view over the result store; only one page is loaded at a time."""
+
+    columns = ["Time", "Method", "URL", "Functionality", "Reliability", "Performance", "Security", "Avg ms"]
+
+    def __init__(self, master, store):
+        super().__init__(master)
+        self.title("📜 Past Results")
+        self.geometry("1000x500")
+        self.store = store
+        self.page = 0
+
+        controls = ttk.Frame(self, padding=10)
+        controls.pack(fill="x")
+        ttk.Label(controls, text="Range:").pack(side="left")
+        self.range_var = tk.StringVar(value="All time")
+        range_menu = ttk.Combobox(controls, textvariable=self.range_var, values=list(HISTORY_RANGES), state="readonly", width=14)
+        range_menu.pack(side="left", padx=5)
+        range_menu.bind("<<ComboboxSelected>>", lambda event: self.load_page(0))
+        ttk.Button(controls, text="◀ Newer", command=lambda: self.load_page(self.page - 1)).pack(side="left", padx=5)
+        ttk.Button(controls, text="Older ▶", command=lambda: self.load_page(self.page + 1)).pack(side="left")
+        self.page_label = ttk.Label(controls)
+        self.page_label.pack(side="left", padx=10)
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings")
+        for column in self.columns:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=360 if column == "URL" else 90, anchor="w")
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        self.load_page(0)
+
+    def load_page(self, page):
+        span = HISTORY_RANGES[self.range_var.get()]
+        start = time.time() - span if span else None
+        total = self.store.count(start=start)
+        pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+        self.page = min(max(0, page), pages - 1)
+
+        self.tree.delete(*self.tree.get_children())
+        for r in self.store.page(self.page, HISTORY_PAGE_SIZE, start=start):
+            when = datetime.fromtimestamp(r["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+            self.tree.insert("", tk.END, values=(when, r["method"], r["url"], r["functionality"], r["reliability"],
+                                                 r["performance"], r["security"], f"{r['avg_time']:.1f}"))
+        self.page_label.config(text=f"Page {self.page + 1} of {pages} ({total} results)")
 
 if __name__ == "__main__":
     app = APITester()
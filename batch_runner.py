@@ -0,0 +1,236 @@
+import argparse
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from urllib.parse import urlsplit
+from adaptive_sampling import AdaptiveConfig
+from probe_engine import SECURITY_TTL, WARM_SAMPLES, ProbeEngine, run_probe_suite, sample_apis
+from rate_limit import HostLimiter
+from regression import ALPHA, MIN_CHANGE, compare
+from result_store import DEFAULT_PATH, ResultStore, record_from_results
+from sample_log import SampleLog
+
+METHODS = ["GET", "POST", "PUT", "DELETE"]
+
+
+def load_endpoints(path):
+    """Read (url, method) pairs from a file.
+
+    JSON files may hold a ``{url: method}`` object or a list of ``[url, method]``
+    pairs / ``{"url": ..., "method": ...}`` objects. Anything else is read as text, one ``URL`` or ``METHOD URL`` per
+    line, like testingapi.py; blank lines and ``#`` comments are skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+
+    try:
+        parsed = json.loads(content)
+    except ValueError:
+        parsed = None
+
+    if isinstance(parsed, dict):
+        pairs = list(parsed.items())
+    elif isinstance(parsed, list):
+        pairs = [(e["url"], e.get("method", "GET")) if isinstance(e, dict) else tuple(e) for e in parsed]
+    else:
+        pairs = []
+        for line in content.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            if len(parts) > 1 and parts[0].upper() in METHODS:
+                pairs.append((parts[1], parts[0]))
+            else:
+                pairs.append((parts[0], "GET"))
+
+    # Drop repeats so a sweep hits each endpoint once
+    return list(dict.fromkeys((url, method.upper()) for url, method in pairs))
+
+
+def interleave_by_host(endpoints):
+    # Round-robin across hosts so workers don't queue up behind one origin's limit
+    by_host = {}
+    for url, method in endpoints:
+        by_host.setdefault(urlsplit(url).netloc, []).append((url, method))
+    return [e for group in zip_longest(*by_host.values()) for e in group if e]
+
+
+def failed_results(exc):
+    """Zero scores for an endpoint whose suite raised, in run_probe_suite's shape plus ``error``."""
+    return {
+        "functionality": 0, "reliability": 0, "performance": 0, "security": 0,
+        # What score_reliability reports when no sample succeeded
+        "avg_time": 1000,
+        "phases": {"cold": None, "warm": None},
+        "transfer": None,
+        "sampling": None,
+        "throttled": 0,
+        "distribution": {"latencies": [], "errors": 1, "requests": 1, "throttled": 0},
+        "error": f"{type(exc).__name__}: {exc}",
+    }
+
+
+class BatchRunner:
+    """Runs the probe suite over many endpoints on a bounded worker pool.
+
+    ``per_host`` caps how many endpoints on the same origin are probed at
+    once, whatever the overall worker count; a rate_limit.HostLimiter in
+    ``limiter`` also caps how fast each host is hit. Every individual probe
+    goes to ``sink`` when one is given.
+    """
+
+    def __init__(self, workers=16, per_host=4, headers=None, body_cap=None, adaptive=None, sink=None,
+                 warm_samples=WARM_SAMPLES, security_ttl=SECURITY_TTL, limiter=None, retries=2):
+        self.workers = workers
+        self.adaptive = adaptive
+        self.warm_samples = warm_samples
+        self.per_host = per_host
+        self.headers = headers or {}
+        self.engine = ProbeEngine(pool_size=max(workers, per_host), body_cap=body_cap, sink=sink,
+                                  security_ttl=security_ttl, limiter=limiter, retries=retries)
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def run_one(self, url, method):
+        try:
+            with self._host_limit(url):
+                results = run_probe_suite(self.engine, url, method, self.headers, warm_samples=self.warm_samples,
+                                          adaptive=self.adaptive)
+        except Exception as exc:
+            # e.g. a malformed URL that never becomes a request; one bad line mustn't abort the sweep
+            results = failed_results(exc)
+        results.update(url=url, method=method)
+        if results["sampling"]:
+            results["sampling_summary"] = results["sampling"].summary()
+            results["sampling"] = results["sampling"].as_dict()
+        return results
+
+    def run(self, endpoints):
+        order = {e: i for i, e in enumerate(endpoints)}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda e: self.run_one(*e), interleave_by_host(endpoints)))
+        return sorted(results, key=lambda r: order[(r["url"], r["method"])])
+
+    def close(self):
+        self.engine.close()
+
+
+def format_row(result):
+    return (f"{result['method']:<6} {result['functionality']:>5} {result['reliability']:>7} "
+            f"{result['performance']:>7} {result['security']:>5} {result['avg_time']:>9.1f}  {result['url']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the API test suite headless against a list of endpoints.")
+    parser.add_argument("files", nargs="*", help="URL/method list files (text or JSON)")
+    parser.add_argument("--samples", action="store_true", help="include the built-in sample_apis")
+    parser.add_argument("--workers", type=int, default=16, help="endpoints probed in parallel (default 16)")
+    parser.add_argument("--per-host", type=int, default=4, help="parallel endpoints per origin (default 4)")
+    parser.add_argument("--auth", help="value sent as the Authorization header")
+    parser.add_argument("--body-cap", type=int, help="stop reading each response body after this many bytes "
+                                                      "(0 = headers only; default reads the whole body)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample each endpoint until its latency estimate converges instead of 3 warm samples")
+    parser.add_argument("--quantile", type=float, default=50, help="latency quantile to converge on (default 50)")
+    parser.add_argument("--ci-width", type=float, default=0.10,
+                        help="target confidence interval width relative to the estimate (default 0.10)")
+    parser.add_argument("--max-samples", type=int, default=50,
+                        help="adaptive sample budget per endpoint (default 50; raised to the fewest samples that can "
+                             "bound the quantile, e.g. 73 for p95)")
+    parser.add_argument("--warm-samples", type=int, default=WARM_SAMPLES,
+                        help=f"latency samples per endpoint without --adaptive (default {WARM_SAMPLES}; "
+                             "use 20 or more for baselines)")
+    parser.add_argument("--host-rps", type=float,
+                        help="requests per second allowed per host, lowered automatically on 429/503")
+    parser.add_argument("--host-burst", type=int, default=5, help="burst allowed per host with --host-rps (default 5)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="retries of a throttled (429/503) request after its Retry-After (default 2)")
+    parser.add_argument("--security-ttl", type=float, default=SECURITY_TTL,
+                        help=f"seconds an origin's security-header scan is reused (default {SECURITY_TTL}; 0 = off)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="save each endpoint's latency distribution as its baseline in the --history store")
+    parser.add_argument("--compare-baseline", action="store_true",
+                        help="test each endpoint against its saved baseline; exit 1 on a significant regression "
+                             "or when nothing could be measured")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help=f"significance level (default {ALPHA})")
+    parser.add_argument("--min-change", type=float, default=MIN_CHANGE,
+                        help=f"smallest relative slowdown to flag (default {MIN_CHANGE})")
+    parser.add_argument("--json", dest="json_out", help="write the full results to this JSON file")
+    parser.add_argument("--history", default=DEFAULT_PATH, help=f"result store to append to (default {DEFAULT_PATH})")
+    parser.add_argument("--no-history", action="store_true", help="don't record results in the result store")
+    parser.add_argument("--log", help="stream every probe to this .jsonl or .csv file")
+    parser.add_argument("--log-max-mb", type=float, default=50, help="rotate the probe log at this size (default 50)")
+    parser.add_argument("--log-backups", type=int, default=5, help="rotated probe logs to keep (default 5)")
+    args = parser.parse_args(argv)
+
+    endpoints = list(sample_apis) if args.samples else []
+    for path in args.files:
+        endpoints += load_endpoints(path)
+    endpoints = list(dict.fromkeys(endpoints))
+    if not endpoints:
+        parser.error("no endpoints given; pass a file or --samples")
+
+    adaptive = AdaptiveConfig(args.quantile, args.ci_width, max_samples=args.max_samples) if args.adaptive else None
+    sink = SampleLog(args.log, max_bytes=int(args.log_max_mb * 1024 * 1024), backups=args.log_backups) \
+        if args.log else None
+    runner = BatchRunner(args.workers, args.per_host, {"Authorization": args.auth} if args.auth else None,
+                         args.body_cap, adaptive, sink, args.warm_samples, args.security_ttl,
+                         HostLimiter(args.host_rps, args.host_burst) if args.host_rps else None, args.retries)
+    try:
+        results = runner.run(endpoints)
+    finally:
+        runner.close()
+        if sink:
+            sink.close()
+
+    comparisons = []
+    if not args.no_history or args.save_baseline or args.compare_baseline:
+        store = ResultStore(args.history)
+        try:
+            if args.compare_baseline:
+                comparisons = [compare(r["url"], r["method"], store.baseline(r["url"], r["method"]),
+                                       r["distribution"], args.alpha, args.min_change) for r in results]
+            if args.save_baseline:
+                # A fully throttled run says nothing about the endpoint; keep its previous baseline
+                store.save_baselines([(r["url"], r["method"], r["distribution"]) for r in results
+                                      if r["distribution"]["requests"]])
+            if not args.no_history:
+                store.add_many([record_from_results(r["url"], r["method"], r) for r in results])
+        finally:
+            store.close()
+
+    print(f"{'METHOD':<6} {'FUNC':>5} {'RELIAB':>7} {'PERF':>7} {'SEC':>5} {'AVG MS':>9}  URL")
+    for result in results:
+        print(format_row(result))
+        if result.get("sampling_summary"):
+            print(f"       {result['sampling_summary']}")
+        if result.get("error"):
+            print(f"       failed: {result['error']}")
+        if result.get("throttled"):
+            print(f"       {result['throttled']} throttled responses (429/503), left out of the scores")
+
+    if comparisons:
+        print("\nBaseline comparison:")
+        for comparison in comparisons:
+            status = "REGRESSED" if comparison.regressed else "NO DATA" if comparison.inconclusive else "ok"
+            print(f"{status:<9} {comparison.method:<6} {comparison.url}")
+            print(f"          {comparison.summary()}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(c.regressed or c.inconclusive for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Throughput, CPU and memory benchmark for the probe engine.
+
+Runs the engine against the bundled mock server (no network needed) and
+compares the results with benchmarks/baseline.json. Run from the repository
+root:
+
+    python benchmarks/bench_engine.py                    # compare with the baseline
+    python benchmarks/bench_engine.py --update-baseline  # record a new baseline
+
+Exits with status 1 when a metric is worse than the baseline by more than
+the tolerance. Baselines are machine-specific; record one per CI runner type.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from load_test import LoadConfig, run_load  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+from probe_engine import ProbeEngine, run_probe_suite  # noqa: E402
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Whether a bigger number is better, per metric
+HIGHER_IS_BETTER = {
+    "sequential_rps": True,
+    "cpu_us_per_request": False,
+    "alloc_peak_kb": False,
+    "retained_kb": False,
+    "suite_ms": False,
+    "load_rps": True,
+    "load_mp_rps": True,
+}
+
+
+def bench_sequential(url, requests_count):
+    engine = ProbeEngine()
+    engine.probe(url, "GET")  # open the connection outside the timed loop
+    cpu_start, wall_start = time.thread_time(), time.perf_counter()
+    for _ in range(requests_count):
+        engine.probe(url, "GET")
+    wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+    engine.close()
+    return {"sequential_rps": requests_count / wall, "cpu_us_per_request": cpu / requests_count * 1e6}
+
+
+def bench_memory(url, requests_count):
+    engine = ProbeEngine()
+    engine.probe(url, "GET")
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(requests_count):
+        engine.probe(url, "GET")
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    engine.close()
+    return {"alloc_peak_kb": (peak - before) / 1024, "retained_kb": (current - before) / 1024}
+
+
+def bench_suite(url, runs):
+    engine = ProbeEngine()
+    start = time.perf_counter()
+    for _ in range(runs):
+        run_probe_suite(engine, url, "GET")
+    engine.close()
+    return {"suite_ms": (time.perf_counter() - start) / runs * 1000}
+
+
+def bench_load(url, requests_count, workers):
+    report = run_load(url, "GET", config=LoadConfig(workers=workers, total_requests=requests_count))
+    # One process per core, but at least two so the multi-process path runs even on a single-core machine
+    processes = max(2, os.cpu_count() or 1)
+    spread = run_load(url, "GET", config=LoadConfig(workers=workers, total_requests=requests_count,
+                                                    processes=processes))
+    return {"load_rps": report.throughput, "load_mp_rps": spread.throughput}
+
+
+def run_all(requests_count, workers, payload_size):
+    with MockServer(payload_size=payload_size) as server:
+        results = {}
+        results.update(bench_sequential(server.url, requests_count))
+        results.update(bench_memory(server.url, requests_count))
+        results.update(bench_suite(server.url, max(1, requests_count // 10)))
+        results.update(bench_load(server.url, requests_count, workers))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"{'metric':<22} {'result':>12} {'baseline':>12} {'change':>9}")
+    for metric, value in results.items():
+        base = baseline.get(metric)
+        if not base:
+            print(f"{metric:<22} {value:>12.2f} {'-':>12} {'-':>9}")
+            continue
+        change = (value - base) / base
+        worse = -change if HIGHER_IS_BETTER[metric] else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        print(f"{metric:<22} {value:>12.2f} {base:>12.2f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(metric)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the probe engine against the local mock server.")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per measurement (default 2000)")
+    parser.add_argument("--workers", type=int, default=16, help="load-mode workers (default 16)")
+    parser.add_argument("--size", type=int, default=1024, help="mock response size in bytes (default 1024)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed fractional slowdown (default 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.requests, args.workers, args.size)
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({k: round(v, 2) for k, v in results.items()}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+    return 1 if compare(results, baseline, args.tolerance) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
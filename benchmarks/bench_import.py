@@ -0,0 +1,46 @@
+"""Import-time benchmark for the API tester modules.
+
+Each module is imported in a fresh interpreter several times and the median
+wall time is reported, next to the cost of the GUI stack the headless core
+no longer pulls in. Run from the repository root:
+
+    python benchmarks/bench_import.py
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "interpreter only": "pass",
+    "probe_engine (core)": "import probe_engine",
+    "batch_runner (headless)": "import batch_runner",
+    "api_tester (GUI)": "import api_tester",
+    "tkinter + pyplot + TkAgg (old eager cost)":
+        "import tkinter, matplotlib.pyplot, matplotlib.backends.backend_tkagg",
+}
+
+
+def time_import(statement, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(runs=7):
+    print(f"{'module':<45} {'median ms':>10}")
+    for label, statement in TARGETS.items():
+        try:
+            print(f"{label:<45} {time_import(statement, runs):>10.1f}")
+        except subprocess.CalledProcessError:
+            print(f"{label:<45} {'unavailable':>10}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 7)
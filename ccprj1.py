@@ -1,21 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-import requests
-import time
 import threading
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from phase_timing import format_phases
+from probe_engine import ProbeEngine, format_transfer, run_probe_suite
+from result_store import ResultStore, record_from_results
+from ui_events import BoundedLog, EventPump
 
-# Security headers to check
-SECURITY_HEADERS = [
-    "Strict-Transport-Security",
-    "Content-Security-Policy",
-    "X-Content-Type-Options",
-    "X-Frame-Options",
-]
-
-# Store test history
-test_history = []
+# Results shown by "View Past Results"
+HISTORY_LIMIT = 20
+# Report lines kept in the text area
+REPORT_MAX_LINES = 2000
 
 
 class APITester(tk.Tk):
@@ -24,6 +18,10 @@ class APITester(tk.Tk):
         self.title("\U0001F680 API Testing Tool")
         self.geometry("1000x750")
         self.configure(bg="#2E2E2E")
+        self.engine = ProbeEngine()
+        self.store = ResultStore()
+        self.score_chart = None
+        self.cancel_event = threading.Event()
 
         self.style = ttk.Style()
         self.style.theme_use("clam")
@@ -35,6 +33,15 @@ class APITester(tk.Tk):
 
         self.create_widgets()
 
+        self.report_log = BoundedLog(self.report_area, REPORT_MAX_LINES)
+        self.events = EventPump(self, {
+            "report": self.report_log.append,
+            "error": lambda errors: [messagebox.showerror(*e) for e in errors],
+            "scores": lambda scores: self.show_graph(scores[-1]),
+            "done": lambda _: self.reset_ui(),
+        }, on_error=self.show_event_error)
+        self.events.start()
+
     def create_widgets(self):
         frame = ttk.Frame(self, padding=15)
         frame.pack(fill="both", expand=True)
@@ -62,6 +69,9 @@ class APITester(tk.Tk):
         self.history_button = ttk.Button(frame, text="📜 View Past Results", command=self.show_history)
         self.history_button.grid(row=4, column=0, padx=5, pady=5, sticky="w")
 
+        self.cancel_button = ttk.Button(frame, text="⛔ Cancel", command=self.cancel_tests, state=tk.DISABLED)
+        self.cancel_button.grid(row=4, column=2, padx=5, pady=5, sticky="e")
+
         self.canvas_frame = ttk.Frame(frame)
         self.canvas_frame.grid(row=5, column=0, columnspan=3, pady=10, sticky="nsew")
 
@@ -69,110 +79,95 @@ class APITester(tk.Tk):
         frame.rowconfigure(3, weight=1)
 
     def run_tests(self):
-        self.test_button.config(state=tk.DISABLED)
-        self.progress.start()
-        self.report_area.delete(1.0, tk.END)
-
-        threading.Thread(target=self.perform_tests, daemon=True).start()
-
-    def perform_tests(self):
         url = self.url_entry.get().strip()
         method = self.method_var.get().strip().upper()
 
         if not url:
             messagebox.showerror("⚠ Error", "Please enter an API URL.")
-            self.reset_ui()
             return
 
-        self.append_report(f"🌍 Testing API: {url} ({method})\n\n")
-
-        functionality = self.test_functionality(url, method)
-        reliability, avg_time = self.test_reliability(url, method)
-        security = self.test_security(url, method)
-        performance = max(0, 100 - avg_time / 10)
-        performance = round(performance, 2)
-
-        # Reasoning for scores
-        functionality_reason = "✔ Fully functional" if functionality == 100 else "⚠ Partial functionality issues detected"
-        reliability_reason = "✔ Stable response times" if reliability > 80 else "⚠ Inconsistent response times"
-        performance_reason = "✔ Fast response" if performance > 80 else "⚠ Slower than expected"
-        security_reason = "✔ Secure headers and HTTPS" if security > 80 else "⚠ Some security headers missing"
-
-        self.append_report("\n✅ API testing complete.\n")
-        self.append_report(f"🛠 **Functionality Score**: {functionality}/100 - {functionality_reason}\n")
-        self.append_report(f"🔄 **Reliability Score**: {reliability}/100 - {reliability_reason} (Avg Response Time: {avg_time:.2f} ms)\n")
-        self.append_report(f"🚀 **Performance Score**: {performance}/100 - {performance_reason}\n")
-        self.append_report(f"🔒 **Security Score**: {security}/100 - {security_reason}\n")
-
-        # Store results
-        test_history.append({
-            "URL": url,
-            "Method": method,
-            "Functionality Score": functionality,
-            "Reliability Score": reliability,
-            "Performance Score": performance,
-            "Security Score": security
-        })
-
-        # Update graph dynamically
-        self.after(0, self.show_graph, [functionality, reliability, performance, security])
-        self.reset_ui()
-
-    def test_functionality(self, url, method):
-        try:
-            response = requests.request(method, url)
-            return 100 if response.status_code == 200 else 50
-        except:
-            return 0
-
-    def test_reliability(self, url, method):
-        response_times = []
-        for _ in range(3):
-            try:
-                start = time.time()
-                requests.request(method, url)
-                response_times.append((time.time() - start) * 1000)
-            except:
-                response_times.append(None)
-
-        avg_time = sum(filter(None, response_times)) / len(response_times) if response_times else 1000
-        reliability_score = max(0, 100 - avg_time / 10)
-        return round(reliability_score, 2), avg_time
-
-    def test_security(self, url, method):
-        try:
-            response = requests.request(method, url)
-            https_check = 100 if url.startswith("https://") else 50
-            headers_score = sum(25 for header in SECURITY_HEADERS if header in response.headers)
-            return min(100, https_check + headers_score)
-        except:
-            return 0
+        self.cancel_event.clear()
+        self.test_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress.start()
+        self.report_log.clear()
 
-    def show_graph(self, scores):
-        for widget in self.canvas_frame.winfo_children():
-            widget.destroy()
+        threading.Thread(target=self.perform_tests, args=(url, method), daemon=True).start()
 
-        labels = ["Functionality", "Reliability", "Performance", "Security"]
-        fig, ax = plt.subplots()
-        ax.bar(labels, scores, color="green")
-        ax.set_ylabel("Score (0-100)")
-        ax.set_title("API Test Scores")
-        ax.set_ylim([0, 100])
+    def cancel_tests(self):
+        self.cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.append_report("\n⛔ Cancelling, waiting for in-flight requests...\n")
 
-        canvas = FigureCanvasTkAgg(fig, master=self.canvas_frame)
-        canvas.get_tk_widget().pack()
-        canvas.draw()
+    def perform_tests(self, url, method):
+        # Runs on a worker thread: talk to the UI only through self.events
+        try:
+            self.append_report(f"🌍 Testing API: {url} ({method})\n\n")
+
+            results = run_probe_suite(self.engine, url, method, cancel=self.cancel_event)
+            if self.cancel_event.is_set():
+                self.append_report("⛔ Run cancelled, results discarded.\n")
+                return
+
+            functionality = results["functionality"]
+            reliability, avg_time = results["reliability"], results["avg_time"]
+            performance = results["performance"]
+            security = results["security"]
+
+            # Reasoning for scores
+            functionality_reason = "✔ Fully functional" if functionality == 100 else "⚠ Partial functionality issues detected"
+            reliability_reason = "✔ Stable response times" if reliability > 80 else "⚠ Inconsistent response times"
+            performance_reason = "✔ Fast response" if performance > 80 else "⚠ Slower than expected"
+            security_reason = "✔ Secure headers and HTTPS" if security > 80 else "⚠ Some security headers missing"
+
+            self.append_report("\n✅ API testing complete.\n")
+            self.append_report(f"🛠 **Functionality Score**: {functionality}/100 - {functionality_reason}\n")
+            self.append_report(f"🔄 **Reliability Score**: {reliability}/100 - {reliability_reason} (Avg Response Time: {avg_time:.2f} ms)\n")
+            self.append_report(f"🚀 **Performance Score**: {performance}/100 - {performance_reason}\n")
+            self.append_report(f"🔒 **Security Score**: {security}/100 - {security_reason}\n")
+
+            phases = results["phases"]
+            self.append_report(f"⏱ First request: {format_phases(phases['cold'])}\n")
+            if phases["warm"]:
+                self.append_report(f"⏱ Warm average: {format_phases(phases['warm'])}\n")
+            if results["transfer"]:
+                self.append_report(f"📦 Body: {format_transfer(results['transfer'])}\n")
+
+            # Store results
+            self.store.add(record_from_results(url, method, results))
+
+            # Update graph dynamically
+            self.events.post("scores", [functionality, reliability, performance, security])
+        except Exception as exc:
+            self.events.post("error", ("⚠ Error", f"Test run failed: {exc}"))
+        finally:
+            self.events.post("done")
+
+    def show_graph(self, scores):
+        if self.score_chart is None:
+            # matplotlib is only loaded once there is a chart to draw
+            from charts import ScoreChart
+            self.score_chart = ScoreChart(self.canvas_frame, figsize=(6.4, 4.8))
+            self.score_chart.set_colors("white", "black", "green")
+        self.score_chart.update(scores)
 
     def append_report(self, text):
-        self.report_area.insert(tk.END, text)
-        self.report_area.see(tk.END)
+        self.events.post("report", text)
 
     def reset_ui(self):
         self.test_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
         self.progress.stop()
 
+    def show_event_error(self, kind, exc):
+        # e.g. the chart failing to load matplotlib; the run itself carries on
+        messagebox.showerror("⚠ Error", f"Could not show {kind}: {exc}")
+
     def show_history(self):
-        messagebox.showinfo("📜 Past Results", "\n".join([str(h) for h in test_history]))
+        recent = self.store.page(0, HISTORY_LIMIT)
+        lines = [f"{r['method']} {r['url']} | F {r['functionality']} | R {r['reliability']} | "
+                 f"P {r['performance']} | S {r['security']}" for r in recent]
+        messagebox.showinfo("📜 Past Results", "\n".join(lines) or "No past results yet.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+from collections import deque
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+SCORE_LABELS = ["Functionality", "Reliability", "Performance", "Security"]
+
+
+class ScoreChart:
+    """Bar chart of the four scores, built once and updated in place.
+
+    Figures are created through matplotlib.figure rather than pyplot, so they
+    never enter pyplot's global figure registry and are freed with the widget.
+    """
+
+    def __init__(self, master, figsize=(6, 4)):
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot()
+        self.bars = self.ax.bar(SCORE_LABELS, [0] * len(SCORE_LABELS))
+        self.ax.set_ylabel("Score (0-100)")
+        self.ax.set_title("API Test Scores")
+        self.ax.set_ylim([0, 100])
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(side="left", fill="both", expand=True)
+
+    def set_colors(self, bg_color, text_color, bar_color):
+        self.figure.patch.set_facecolor(bg_color)
+        self.ax.set_facecolor(bg_color)
+        self.ax.yaxis.label.set_color(text_color)
+        self.ax.title.set_color(text_color)
+        self.ax.tick_params(axis="x", colors=text_color)
+        self.ax.tick_params(axis="y", colors=text_color)
+        for bar in self.bars:
+            bar.set_color(bar_color)
+        self.canvas.draw_idle()
+
+    def update(self, scores):
+        for bar, score in zip(self.bars, scores):
+            bar.set_height(score)
+        self.canvas.draw_idle()
+
+
+class LatencyChart:
+    """Live latency time series for load runs, redrawn with blitting.
+
+    Only the line is redrawn per update; the axes background is cached and
+    restored. A full redraw happens only when new samples fall outside the
+    current axis limits. At most ``window`` points are kept.
+    """
+
+    def __init__(self, master, window=2000, figsize=(6, 4)):
+        self.xs = deque(maxlen=window)
+        self.ys = deque(maxlen=window)
+        self.background = None
+
+        self.figure = Figure(figsize=figsize)
+        self.ax = self.figure.add_subplot()
+        (self.line,) = self.ax.plot([], [], ".", markersize=3, animated=True)
+        self.ax.set_xlabel("Time (s)")
+        self.ax.set_ylabel("Latency (ms)")
+        self.ax.set_title("Live Latency")
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(side="left", fill="both", expand=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.reset()
+
+    def set_colors(self, bg_color, text_color, line_color):
+        self.figure.patch.set_facecolor(bg_color)
+        self.ax.set_facecolor(bg_color)
+        for text in (self.ax.xaxis.label, self.ax.yaxis.label, self.ax.title):
+            text.set_color(text_color)
+        self.ax.tick_params(axis="both", colors=text_color)
+        self.line.set_color(line_color)
+        self.canvas.draw_idle()
+
+    def reset(self):
+        self.xs.clear()
+        self.ys.clear()
+        self.line.set_data([], [])
+        self.ax.set_xlim(0, 10)
+        self.ax.set_ylim(0, 100)
+        self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        # Cache the static parts after every full draw, then paint the line on top
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+
+    def add_samples(self, samples):
+        """Append (seconds, latency_ms) points and redraw the line."""
+        if not samples:
+            return
+        for x, y in samples:
+            self.xs.append(x)
+            self.ys.append(y)
+        self.line.set_data(self.xs, self.ys)
+
+        x_max, y_max = self.ax.get_xlim()[1], self.ax.get_ylim()[1]
+        if self.xs[-1] > x_max or max(y for _, y in samples) > y_max or self.background is None:
+            self.ax.set_xlim(self.xs[0] if len(self.xs) == self.xs.maxlen else 0, max(x_max, self.xs[-1] * 1.5))
+            self.ax.set_ylim(0, max(y_max, max(self.ys) * 1.2))
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.ax.bbox)
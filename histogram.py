@@ -0,0 +1,89 @@
+from array import array
+
+# 2**7 sub-buckets per power of two keeps every recorded value within 1/64 (~1.6%)
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF_SUB_BUCKETS = SUB_BUCKETS // 2
+
+
+class LatencyHistogram:
+    """Fixed-memory, mergeable latency histogram in the style of HdrHistogram.
+
+    Values are recorded in whole microseconds into log-linear buckets:
+    exact below 128 us, then 64 buckets per power of two, so percentiles
+    are accurate to about 1.6% however many values are recorded. Values
+    above ``max_ms`` are clamped to it and counted in ``overflow``. The
+    whole histogram is one flat array of counts, cheap to pickle and merge
+    across processes.
+    """
+
+    def __init__(self, max_ms=60_000):
+        self.max_us = int(max_ms * 1000)
+        self.counts = array("Q", bytes(8 * (self._index(self.max_us) + 1)))
+        self.total = 0
+        self.sum_us = 0
+        self.min_us = None
+        self.max_seen_us = 0
+        self.overflow = 0
+
+    @staticmethod
+    def _index(value):
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return shift * HALF_SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def _value(index):
+        # Midpoint of the range of values that share this bucket
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // HALF_SUB_BUCKETS - 1
+        sub = index - shift * HALF_SUB_BUCKETS
+        return ((sub << shift) + ((sub + 1) << shift) - 1) / 2
+
+    def record(self, latency_ms):
+        value = max(0, int(latency_ms * 1000))
+        if value > self.max_us:
+            self.overflow += 1
+            value = self.max_us
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_seen_us = max(self.max_seen_us, value)
+
+    def merge(self, other):
+        if len(other.counts) != len(self.counts):
+            raise ValueError("can only merge histograms with the same max_ms")
+        for i, count in enumerate(other.counts):
+            if count:
+                self.counts[i] += count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_seen_us = max(self.max_seen_us, other.max_seen_us)
+        self.overflow += other.overflow
+        return self
+
+    def percentile(self, pct):
+        """Latency (ms) at the given percentile, nearest-rank, or None when empty."""
+        if not self.total:
+            return None
+        rank = max(1, -(-self.total * pct // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                # Never report beyond what was actually observed
+                return min(max(self._value(index), self.min_us), self.max_seen_us) / 1000
+        return self.max_seen_us / 1000
+
+    @property
+    def mean(self):
+        return self.sum_us / self.total / 1000 if self.total else None
+
+    @property
+    def max(self):
+        return self.max_seen_us / 1000 if self.total else None
@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from load_test import LoadStats
+from probe_engine import ProbeEngine, score_functionality, score_performance, score_security
+from sample_log import SampleLog
+
+
+class Stage:
+    """A stretch of the arrival timetable whose rate moves linearly from start_rps to end_rps."""
+
+    def __init__(self, name, duration, start_rps, end_rps=None):
+        self.name = name
+        self.duration = duration
+        self.start_rps = start_rps
+        self.end_rps = start_rps if end_rps is None else end_rps
+
+    @property
+    def target_rps(self):
+        return (self.start_rps + self.end_rps) / 2
+
+    def arrivals(self):
+        # Intended send offsets (seconds from the start of the stage). The k-th request goes out when the expected
+        # count so far, start*t + slope*t^2/2, reaches k; stepping by 1/rate instead stalls on a ramp from 0 rps
+        half_slope = (self.end_rps - self.start_rps) / (2 * self.duration) if self.duration else 0.0
+        # Without a starting rate nothing is due at t=0
+        k = 0 if self.start_rps > 0 else 1
+        while True:
+            root = self.start_rps ** 2 + 4 * half_slope * k
+            if root < 0 or (k and self.start_rps + math.sqrt(root) <= 0):
+                return
+            # Root of half_slope*t^2 + start*t - k = 0, in a form that stays exact when half_slope is 0
+            t = 2 * k / (self.start_rps + math.sqrt(root)) if k else 0.0
+            # The tolerance stops float drift from squeezing in one arrival too many at the end
+            if t >= self.duration - 1e-9:
+                return
+            yield t
+            k += 1
+
+
+def constant(rps, duration):
+    return [Stage(f"constant {rps:g} rps", duration, rps)]
+
+
+def ramp(start_rps, end_rps, duration, slices=5):
+    # Reported in equal slices so each part of the ramp gets its own percentiles
+    width = duration / slices
+    step = (end_rps - start_rps) / slices
+    return [Stage(f"ramp {start_rps + i * step:.4g}-{start_rps + (i + 1) * step:.4g} rps", width,
+                  start_rps + i * step, start_rps + (i + 1) * step) for i in range(slices)]
+
+
+def step(start_rps, end_rps, steps, step_duration):
+    increment = (end_rps - start_rps) / max(1, steps - 1)
+    return [Stage(f"step {start_rps + i * increment:.4g} rps", step_duration, start_rps + i * increment)
+            for i in range(steps)]
+
+
+def spike(base_rps, spike_rps, base_duration, spike_duration):
+    return [Stage(f"base {base_rps:g} rps", base_duration, base_rps),
+            Stage(f"spike {spike_rps:g} rps", spike_duration, spike_rps),
+            Stage(f"recovery {base_rps:g} rps", base_duration, base_rps)]
+
+
+PROFILES = {"constant": constant, "ramp": ramp, "step": step, "spike": spike}
+
+
+def parse_profile(spec):
+    """Build stages from text like ``step:10,100,5,10`` (name, then that profile's arguments)."""
+    name, _, args = spec.partition(":")
+    if name not in PROFILES:
+        raise ValueError(f"unknown load profile {name!r}")
+    values = [float(a) for a in args.split(",") if a]
+    # Step counts and ramp slices are whole numbers
+    if name == "step" and len(values) > 2:
+        values[2] = int(values[2])
+    if name == "ramp" and len(values) > 3:
+        values[3] = int(values[3])
+    return PROFILES[name](*values)
+
+
+class StageReport:
+    """Per-stage results. Latencies run from each request's intended send time.
+
+    ``achieved_rps`` is measured from when requests actually went out
+    (``send_span``: seconds from the stage's first send to its last), so a
+    tester that fell behind shows a lower rate than the timetable's.
+    """
+
+    def __init__(self, stage, stats, send_span=None):
+        self.stage = stage
+        self.stats = stats
+        self.requests = stats.requests
+        self.errors = stats.errors
+        self.throttled = stats.throttled
+        self.error_rate = stats.error_rate if self.requests else 0.0
+        if send_span:
+            # n sends spaced evenly at rate r span (n - 1) / r seconds
+            self.achieved_rps = (self.requests - 1) / send_span
+        else:
+            self.achieved_rps = self.requests / stage.duration if stage.duration else 0.0
+        self.p50 = stats.latency.percentile(50)
+        self.p90 = stats.latency.percentile(90)
+        self.p99 = stats.latency.percentile(99)
+        self.max = stats.latency.max
+        self.service_p99 = stats.service.percentile(99)
+        # How far behind the timetable the tester itself fell (thread pool saturated)
+        self.max_send_lag = stats.max_lag_ms
+
+    def summary(self):
+        if self.p50 is None:
+            throttled = f" ({self.throttled} throttled)" if self.throttled else ""
+            return f"{self.stage.name}: {self.requests} requests, all failed{throttled}"
+        text = (f"{self.stage.name}: {self.achieved_rps:.1f} req/s, errors {self.error_rate:.1%} | "
+                f"p50 {self.p50:.1f}, p90 {self.p90:.1f}, p99 {self.p99:.1f} ms "
+                f"(service-time p99 {self.service_p99:.1f} ms)")
+        if self.throttled:
+            text += f", {self.throttled} throttled"
+        if self.max_send_lag > 50:
+            text += f" ⚠ tester fell {self.max_send_lag:.0f} ms behind schedule"
+        return text
+
+
+class ProfileReport:
+    def __init__(self, stages, stage_stats, elapsed_s, send_spans=None):
+        send_spans = send_spans or [None] * len(stages)
+        self.stages = [StageReport(stage, stats, span) for stage, stats, span in zip(stages, stage_stats, send_spans)]
+        self.elapsed_s = elapsed_s
+        self.stats = LoadStats(corrected=True)
+        for stats in stage_stats:
+            self.stats.merge(stats)
+        self.requests = self.stats.requests
+        self.error_rate = self.stats.error_rate
+        self.p50 = self.stats.latency.percentile(50)
+        self.p99 = self.stats.latency.percentile(99)
+
+    def breaking_point(self, p99_limit_ms, max_error_rate=0.01):
+        """First stage whose p99 or error rate (5xx answers included) crosses the limits, or None."""
+        for report in self.stages:
+            if report.requests and (report.p99 is None or report.p99 > p99_limit_ms
+                                    or report.error_rate > max_error_rate):
+                return report
+        return None
+
+
+async def _run_timetable(engine, url, method, headers, data, stages, max_in_flight, on_sample, cancel):
+    loop = asyncio.get_running_loop()
+    stage_stats = [LoadStats(corrected=True) for _ in stages]
+    # First and last actual send time of each stage
+    sends = [[None, None] for _ in stages]
+    # Only requests still in flight are held; each task drops itself once done, so memory stays flat on long runs
+    in_flight = set()
+    start = time.perf_counter()
+
+    def timed_probe(intended):
+        # Runs on the pool; the gap to the intended time is tester-side lag
+        lag = (time.perf_counter() - intended) * 1000
+        return lag, engine.probe(url, method, headers, data)
+
+    async def fire(index, intended):
+        lag, result = await loop.run_in_executor(executor, timed_probe, intended)
+        latency = (time.perf_counter() - intended) * 1000
+        sent = intended + lag / 1000
+        first, last = sends[index]
+        sends[index] = [sent if first is None else min(first, sent), sent if last is None else max(last, sent)]
+        stage_stats[index].add(result, latency, lag)
+        if on_sample:
+            on_sample(intended - start, result, latency)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        stage_start = start
+        for index, stage in enumerate(stages):
+            for offset in stage.arrivals():
+                if cancel and cancel.is_set():
+                    break
+                intended = stage_start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Open loop: send on schedule whether or not earlier requests have returned
+                task = asyncio.ensure_future(fire(index, intended))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            stage_start += stage.duration
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    spans = [last - first if first is not None else None for first, last in sends]
+    return ProfileReport(stages, stage_stats, time.perf_counter() - start, spans)
+
+
+def run_profile(url, method, stages, headers=None, data=None, max_in_flight=64, on_sample=None, cancel=None,
+                body_cap=None, sink=None):
+    """Send requests on a fixed arrival timetable and report each stage.
+
+    Requests go out at their scheduled times regardless of how many are
+    still in flight (up to ``max_in_flight`` run concurrently; beyond that
+    they queue and the delay is counted). Latency is measured from the
+    intended send time, so a slow server cannot hide its slowness by
+    slowing the load down (coordinated omission). ``on_sample`` gets
+    (intended offset s, ProbeResult, corrected latency ms).
+    """
+    engine = ProbeEngine(pool_size=max_in_flight, body_cap=body_cap, sink=sink, retries=0)
+    try:
+        return asyncio.run(_run_timetable(engine, url, method, headers, data, stages, max_in_flight, on_sample,
+                                          cancel))
+    finally:
+        engine.close()
+
+
+def run_profile_suite(engine, url, method, headers=None, data=None, stages=None, max_in_flight=64, on_sample=None,
+                      cancel=None):
+    """Like run_load_suite, with latency scores from an open-loop profile run."""
+    cold = engine.probe(url, method, headers, data, conditional=True)
+    report = None
+    if cold.ok:
+        report = run_profile(url, method, stages, headers, data, max_in_flight, on_sample, cancel, engine.body_cap,
+                             engine.sink)
+    if report is None:
+        stats = LoadStats()
+        stats.add(cold)
+    else:
+        stats = report.stats
+    transfer = stats.transfer()
+    if report and report.p50 is not None:
+        reliability = round(max(0, 100 * (1 - report.error_rate) - (report.p99 - report.p50) / 10), 2)
+        performance = score_performance(report.p50, transfer and transfer["throughput"])
+        avg_time = report.p50
+    else:
+        reliability, performance, avg_time = 0, 0, 1000
+    return {
+        "functionality": score_functionality(cold),
+        "reliability": reliability,
+        "performance": performance,
+        "security": score_security(url, cold, engine.security),
+        "avg_time": avg_time,
+        "phases": {"cold": cold.phases, "warm": stats.phases()},
+        "transfer": transfer,
+        "profile": report,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive an endpoint with an open-loop load profile.")
+    parser.add_argument("url")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--profile", required=True,
+                        help="constant:RPS,SECONDS | ramp:FROM,TO,SECONDS[,SLICES] | "
+                             "step:FROM,TO,STEPS,STEP_SECONDS | spike:BASE,PEAK,BASE_SECONDS,PEAK_SECONDS")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="concurrent requests allowed (default 64)")
+    parser.add_argument("--p99-limit", type=float, help="report the first stage whose p99 exceeds this (ms)")
+    parser.add_argument("--log", help="stream every request to this .jsonl or .csv file")
+    args = parser.parse_args(argv)
+
+    sink = SampleLog(args.log) if args.log else None
+    try:
+        report = run_profile(args.url, args.method.upper(), parse_profile(args.profile),
+                             max_in_flight=args.max_in_flight, sink=sink)
+    finally:
+        if sink:
+            sink.close()
+    for stage in report.stages:
+        print(stage.summary())
+    if args.p99_limit:
+        broken = report.breaking_point(args.p99_limit)
+        print(f"Breaking point: {broken.stage.name}" if broken else f"p99 stayed under {args.p99_limit:g} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
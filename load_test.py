@@ -0,0 +1,314 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from histogram import LatencyHistogram
+from phase_timing import PHASES
+from probe_engine import MIN_THROUGHPUT_BYTES, ProbeEngine, score_functionality, score_performance, score_security
+from sample_log import SampleLog
+
+# Requests sent when neither a count nor a duration is given
+DEFAULT_REQUESTS = 100
+
+
+class LoadConfig:
+    """How much load to generate.
+
+    The run stops after ``total_requests`` or ``duration`` seconds, whichever
+    comes first; with neither set it sends DEFAULT_REQUESTS. ``target_rps`` paces the
+    workers; without it they send back to back. With ``processes`` above 1
+    the workers, request count and rate are split across that many worker
+    processes (0 means one per CPU core).
+    """
+
+    def __init__(self, workers=10, total_requests=None, duration=None, target_rps=None, processes=1):
+        if total_requests is None and not duration:
+            total_requests = DEFAULT_REQUESTS
+        if not total_requests and not duration:
+            raise ValueError("LoadConfig needs total_requests or duration")
+        self.workers = max(1, int(workers))
+        self.total_requests = total_requests
+        self.duration = duration
+        self.target_rps = target_rps
+        self.processes = int(processes) if processes else os.cpu_count() or 1
+
+    def split(self):
+        """One config per worker process, sharing out workers, requests and rate."""
+        # Never more shares than requests, so none is empty and the rate divides over processes that send
+        count = min(self.processes, self.workers, self.total_requests or self.workers)
+        configs = []
+        for i in range(count):
+            total = None
+            if self.total_requests:
+                total = self.total_requests // count + (1 if i < self.total_requests % count else 0)
+            configs.append(LoadConfig(self.workers // count + (1 if i < self.workers % count else 0), total,
+                                      self.duration, self.target_rps and self.target_rps / count))
+        return configs
+
+
+class LoadStats:
+    """Constant-memory running totals for a load run.
+
+    Latencies of successful requests go into a LatencyHistogram; everything
+    else (error count, body sizes, phase timings) is kept as sums, so memory
+    does not grow with the number of requests and two LoadStats can be
+    merged. Errors are requests that got no response or a 5xx one. With ``corrected`` set, ``add`` takes a separate latency (e.g.
+    measured from the intended send time) and the raw service time goes
+    into the ``service`` histogram. Throttled responses (429, or 503 with
+    Retry-After) are only counted, in ``throttled``; they are neither
+    latencies nor errors.
+    """
+
+    def __init__(self, corrected=False):
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram() if corrected else None
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.max_lag_ms = 0.0
+        self.bytes = 0
+        self.elapsed_ms = 0.0
+        self.throughput_sum = 0.0
+        self.throughput_count = 0
+        self.truncated = False
+        self.phase_sums = dict.fromkeys(PHASES, 0.0)
+        self.phase_count = 0
+
+    def add(self, sample, latency_ms=None, lag_ms=0.0):
+        self.requests += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if sample.throttled:
+            self.throttled += 1
+            return
+        if sample.failed:
+            self.errors += 1
+            return
+        self.latency.record(sample.elapsed_ms if latency_ms is None else latency_ms)
+        if self.service is not None:
+            self.service.record(sample.elapsed_ms)
+        self.bytes += sample.bytes_read
+        self.elapsed_ms += sample.elapsed_ms
+        self.truncated = self.truncated or sample.truncated
+        if sample.bytes_read >= MIN_THROUGHPUT_BYTES and sample.throughput:
+            self.throughput_sum += sample.throughput
+            self.throughput_count += 1
+        if sample.phases:
+            for name in PHASES:
+                self.phase_sums[name] += sample.phases[name]
+            self.phase_count += 1
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        if self.service is not None and other.service is not None:
+            self.service.merge(other.service)
+        for name in ("requests", "errors", "throttled", "bytes", "elapsed_ms", "throughput_sum", "throughput_count",
+                     "phase_count"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.max_lag_ms = max(self.max_lag_ms, other.max_lag_ms)
+        self.truncated = self.truncated or other.truncated
+        for name in PHASES:
+            self.phase_sums[name] += other.phase_sums[name]
+        return self
+
+    @property
+    def ok(self):
+        return self.requests - self.errors - self.throttled
+
+    @property
+    def error_rate(self):
+        # Share of answered-or-failed requests that failed; throttled ones are left out
+        counted = self.requests - self.throttled
+        return self.errors / counted if counted else 1.0
+
+    def phases(self):
+        # Same shape as average_phases over the successful samples
+        if not self.phase_count:
+            return None
+        return {name: total / self.phase_count for name, total in self.phase_sums.items()}
+
+    def transfer(self):
+        # Same shape as probe_engine.transfer_stats over the successful samples
+        if not self.ok:
+            return None
+        return {
+            "bytes": self.bytes / self.ok,
+            "throughput": self.throughput_sum / self.throughput_count if self.throughput_count else None,
+            "ttlb": self.elapsed_ms / self.ok,
+            "truncated": self.truncated,
+        }
+
+
+class LoadReport:
+    def __init__(self, stats, elapsed_s, processes=1):
+        self.stats = stats
+        self.elapsed_s = elapsed_s
+        self.processes = processes
+        self.requests = stats.requests
+        self.errors = stats.errors
+        self.throttled = stats.throttled
+        self.error_rate = stats.error_rate
+        self.throughput = self.requests / elapsed_s if elapsed_s > 0 else 0.0
+        self.p50 = stats.latency.percentile(50)
+        self.p90 = stats.latency.percentile(90)
+        self.p99 = stats.latency.percentile(99)
+        self.max = stats.latency.max
+
+    def summary(self):
+        throttled = f", {self.throttled} throttled" if self.throttled else ""
+        if self.p50 is None:
+            return f"{self.requests} requests, all failed{throttled}"
+        processes = f" across {self.processes} processes" if self.processes > 1 else ""
+        return (f"{self.requests} requests in {self.elapsed_s:.2f}s{processes} ({self.throughput:.1f} req/s), "
+                f"errors {self.error_rate:.1%}{throttled} | p50 {self.p50:.1f} ms, p90 {self.p90:.1f} ms, "
+                f"p99 {self.p99:.1f} ms, max {self.max:.1f} ms")
+
+
+async def _drive(engine, url, method, headers, data, config, on_sample, cancel):
+    loop = asyncio.get_running_loop()
+    stats = LoadStats()
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + config.duration if config.duration else None
+    interval = 1 / config.target_rps if config.target_rps else 0
+
+    def next_slot():
+        nonlocal issued
+        if cancel and cancel.is_set():
+            return None
+        if config.total_requests and issued >= config.total_requests:
+            return None
+        if deadline and max(time.perf_counter(), start + issued * interval) >= deadline:
+            return None
+        issued += 1
+        return issued - 1
+
+    async def worker(executor):
+        while True:
+            slot = next_slot()
+            if slot is None:
+                return
+            if interval:
+                delay = start + slot * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            sample = await loop.run_in_executor(executor, engine.probe, url, method, headers, data)
+            stats.add(sample)
+            if on_sample:
+                on_sample(time.perf_counter() - start, sample)
+
+    with ThreadPoolExecutor(max_workers=config.workers) as executor:
+        await asyncio.gather(*(worker(executor) for _ in range(config.workers)))
+    return LoadReport(stats, time.perf_counter() - start)
+
+
+# Set in each worker process by _init_process; the parent sets it to cancel
+_process_cancel = None
+
+
+def _init_process(cancel):
+    global _process_cancel
+    _process_cancel = cancel
+
+
+def _process_load(url, method, headers, data, config, body_cap, log_settings):
+    # Runs in a worker process; only the fixed-size LoadStats travels back
+    sink = SampleLog(**log_settings) if log_settings else None
+    try:
+        return run_load(url, method, headers, data, config, cancel=_process_cancel, body_cap=body_cap,
+                        sink=sink).stats
+    finally:
+        if sink:
+            sink.close()
+
+
+def _run_processes(url, method, headers, data, config, cancel, body_cap, sink):
+    configs = config.split()
+    context = multiprocessing.get_context()
+    stop = context.Event()
+    finished = threading.Event()
+
+    def forward_cancel():
+        while not finished.is_set():
+            if cancel.wait(0.1):
+                stop.set()
+                return
+
+    if cancel:
+        threading.Thread(target=forward_cancel, daemon=True).start()
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(len(configs), mp_context=context, initializer=_init_process,
+                                 initargs=(stop,)) as pool:
+            futures = [pool.submit(_process_load, url, method, headers, data, part, body_cap,
+                                   sink.part(i) if sink else None) for i, part in enumerate(configs)]
+            stats = LoadStats()
+            for future in futures:
+                stats.merge(future.result())
+    finally:
+        finished.set()
+    return LoadReport(stats, time.perf_counter() - start, len(configs))
+
+
+def run_load(url, method, headers=None, data=None, config=None, engine=None, on_sample=None, cancel=None,
+             body_cap=None, sink=None):
+    """Generate load against one endpoint and return a LoadReport.
+
+    Workers are asyncio tasks; each request goes through the blocking probe
+    engine on a thread pool sized to the worker count, so the connection pool
+    is sized to match when no engine is passed in (``body_cap`` and ``sink``
+    apply to that engine). ``on_sample`` is called
+    with (seconds since start, ProbeResult) as each request completes.
+    Setting the ``cancel`` event stops new requests; in-flight ones finish.
+
+    With ``config.processes`` above 1 the load is spread over worker
+    processes, each with its own engine, to get past the GIL. They return
+    only their merged LoadStats histograms, so ``engine`` and ``on_sample``
+    are not used in that mode, and each process logs to its own
+    ``sink.part(n)`` file.
+    """
+    config = config or LoadConfig()
+    if config.processes > 1:
+        return _run_processes(url, method, headers, data, config, cancel, body_cap, sink)
+    own_engine = engine is None
+    if own_engine:
+        # Load runs report throttling rather than waiting it out
+        engine = ProbeEngine(pool_size=config.workers, body_cap=body_cap, sink=sink, retries=0)
+    try:
+        return asyncio.run(_drive(engine, url, method, headers, data, config, on_sample, cancel))
+    finally:
+        if own_engine:
+            engine.close()
+
+
+def score_load(report, transfer=None):
+    # Errors cost reliability directly; so does the gap between median and tail
+    if report.p50 is None:
+        return 0, score_performance(1000)
+    reliability = 100 * (1 - report.error_rate) - (report.p99 - report.p50) / 10
+    return round(max(0, reliability), 2), score_performance(report.p50, transfer and transfer["throughput"])
+
+
+def run_load_suite(engine, url, method, headers=None, data=None, config=None, on_sample=None, cancel=None):
+    """Like run_probe_suite, but latency scores come from a load run."""
+    cold = engine.probe(url, method, headers, data, conditional=True)
+    if cold.ok:
+        report = run_load(url, method, headers, data, config, on_sample=on_sample, cancel=cancel,
+                          body_cap=engine.body_cap, sink=engine.sink)
+    else:
+        stats = LoadStats()
+        stats.add(cold)
+        report = LoadReport(stats, 0)
+    transfer = report.stats.transfer()
+    reliability, performance = score_load(report, transfer)
+    return {
+        "functionality": score_functionality(cold),
+        "reliability": reliability,
+        "performance": performance,
+        "security": score_security(url, cold, engine.security),
+        "avg_time": report.p50 if report.p50 is not None else 1000,
+        "phases": {"cold": cold.phases, "warm": report.stats.phases()},
+        "transfer": transfer,
+        "load": report,
+    }
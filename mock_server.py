@@ -0,0 +1,214 @@
+import argparse
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from probe_engine import SECURITY_HEADERS
+
+FAILURE_MODES = ["reset", "error"]
+
+
+def fixed(ms):
+    return lambda rng: ms / 1000
+
+
+def uniform(low_ms, high_ms):
+    return lambda rng: rng.uniform(low_ms, high_ms) / 1000
+
+
+def normal(mean_ms, sd_ms):
+    return lambda rng: max(0.0, rng.gauss(mean_ms, sd_ms)) / 1000
+
+
+def lognormal(median_ms, sigma):
+    # Long right tail, the usual shape of real service latency
+    return lambda rng: median_ms * rng.lognormvariate(0, sigma) / 1000
+
+
+LATENCY_DISTRIBUTIONS = {"fixed": fixed, "uniform": uniform, "normal": normal, "lognormal": lognormal}
+
+
+def parse_latency(spec):
+    """Build a latency distribution from text like ``lognormal:20,0.5`` or ``fixed:5``."""
+    name, _, args = spec.partition(":")
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"unknown latency distribution {name!r}")
+    return LATENCY_DISTRIBUTIONS[name](*(float(a) for a in args.split(",") if a))
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    # Capped probes and cancelled runs hang up mid-response all the time; only report real handler errors
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockServer:
+    """In-process HTTP server with scriptable latency, payloads and failures.
+
+    Every request sleeps for a draw from ``latency`` (see fixed/uniform/
+    normal/lognormal), then answers ``status`` with a ``payload_size`` byte
+    body and, if ``security_headers`` is set, the headers test_security looks
+    for. Bodies carry an ETag, and a matching If-None-Match gets a 304.
+    With ``rate_limit`` set, requests beyond that many per second (counted
+    in one-second windows) get a 429 with ``Retry-After: 1``.
+    A ``failure_rate`` share of requests fail instead: "reset" drops the
+    connection with a TCP RST, "error" answers 500. Single requests can
+    override status, size and latency with ``?status=``, ``?size=`` and
+    ``?latency_ms=`` query parameters.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=None, payload_size=256, status=200,
+                 security_headers=True, failure_rate=0.0, failure_mode="reset", seed=None, rate_limit=None):
+        if failure_mode not in FAILURE_MODES:
+            raise ValueError(f"failure_mode must be one of {FAILURE_MODES}")
+        self.latency = latency or fixed(0)
+        self.payload_size = payload_size
+        self.status = status
+        self.security_headers = security_headers
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.rate_limit = rate_limit
+        self.requests_served = 0
+        self.requests_throttled = 0
+        self._window = (0, 0)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._payloads = {}
+        self._thread = None
+        self.httpd = QuietHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def payload(self, size):
+        # Bodies are built once per size and shared
+        if size not in self._payloads:
+            self._payloads[size] = b"x" * size
+        return self._payloads[size]
+
+    def _draw(self):
+        with self._lock:
+            self.requests_served += 1
+            return self.latency(self._rng), self._rng.random() < self.failure_rate
+
+    def _over_limit(self):
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            second = int(time.monotonic())
+            window, count = self._window
+            count = count + 1 if window == second else 1
+            self._window = (second, count)
+            if count > self.rate_limit:
+                self.requests_throttled += 1
+                return True
+            return False
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body as one segment; split writes hit Nagle + delayed ACK (~40 ms each)
+            wbufsize = -1
+            disable_nagle_algorithm = True
+
+            def handle_any(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+
+                query = parse_qs(urlsplit(self.path).query)
+                if server._over_limit():
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                delay, fail = server._draw()
+                if "latency_ms" in query:
+                    delay = float(query["latency_ms"][0]) / 1000
+                if delay:
+                    time.sleep(delay)
+
+                if fail and server.failure_mode == "reset":
+                    # SO_LINGER with a zero timeout makes close() send RST
+                    self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                    self.close_connection = True
+                    return
+
+                status = 500 if fail else int(query.get("status", [server.status])[0])
+                body = server.payload(int(query.get("size", [server.payload_size])[0]))
+                etag = f'"mock-{len(body)}"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                if server.security_headers:
+                    for header in SECURITY_HEADERS:
+                        self.send_header(header, "mock")
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = handle_any
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock API for offline testing of the API tester.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="fixed:0", help="e.g. fixed:5, uniform:5,50, normal:20,5, lognormal:20,0.5")
+    parser.add_argument("--size", type=int, default=256, help="response body size in bytes")
+    parser.add_argument("--status", type=int, default=200)
+    parser.add_argument("--no-security-headers", action="store_true")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-mode", choices=FAILURE_MODES, default="reset")
+    parser.add_argument("--rate-limit", type=float, help="answer 429 beyond this many requests per second")
+    args = parser.parse_args(argv)
+
+    server = MockServer(args.host, args.port, parse_latency(args.latency), args.size, args.status,
+                        not args.no_security_headers, args.failure_rate, args.failure_mode,
+                        rate_limit=args.rate_limit)
+    print(f"Mock API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
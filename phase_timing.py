@@ -0,0 +1,120 @@
+import socket
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+PHASES = ["dns", "connect", "tls", "ttfb", "transfer"]
+PHASE_LABELS = {"dns": "DNS", "connect": "Connect", "tls": "TLS", "ttfb": "TTFB", "transfer": "Transfer"}
+
+_local = threading.local()
+
+
+class PhaseRecorder:
+    """Collects per-phase timings (ms, monotonic clock) for one request.
+
+    Connection setup phases are filled in by the timed connection classes
+    below while the recorder is active on the current thread; they stay at
+    zero when the request reuses a pooled keep-alive connection.
+    """
+
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.start = None
+
+    def __enter__(self):
+        _local.recorder = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _local.recorder = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds * 1000
+
+    def mark_headers(self):
+        # Whatever part of the wait for headers isn't connection setup is server time
+        waited = (time.perf_counter() - self.start) * 1000
+        self.phases["ttfb"] = max(0.0, waited - self.phases["dns"] - self.phases["connect"] - self.phases["tls"])
+
+
+def _active_recorder():
+    return getattr(_local, "recorder", None)
+
+
+def format_phases(phases):
+    return " | ".join(f"{PHASE_LABELS[name]} {phases[name]:.1f}" for name in PHASES) + " ms"
+
+
+def average_phases(samples):
+    if not samples:
+        return None
+    return {name: sum(p[name] for p in samples) / len(samples) for name in PHASES}
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        recorder = _active_recorder()
+        if recorder is None:
+            return super()._new_conn()
+
+        # Resolve up front so name lookup and TCP connect are timed separately
+        start = time.perf_counter()
+        try:
+            addresses = list(dict.fromkeys(
+                info[4][0] for info in socket.getaddrinfo(self._dns_host.strip("[]"), self.port,
+                                                          allowed_gai_family(), socket.SOCK_STREAM)))
+        except OSError:
+            # Let urllib3 hit the same failure and raise its usual error
+            return super()._new_conn()
+        resolved = time.perf_counter()
+        recorder.add("dns", resolved - start)
+
+        # Try each address in turn, as urllib3's create_connection does (e.g. an unreachable IPv6 before IPv4)
+        dns_host = self._dns_host
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError:
+                    # NewConnectionError included
+                    if i == len(addresses) - 1:
+                        raise
+            return super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+            recorder.add("connect", time.perf_counter() - resolved)
+
+
+class TimedHTTPSConnection(TimedHTTPConnection, HTTPSConnection):
+    def connect(self):
+        recorder = _active_recorder()
+        if recorder is None:
+            return super().connect()
+
+        before = recorder.phases["dns"] + recorder.phases["connect"]
+        start = time.perf_counter()
+        super().connect()
+        setup = (time.perf_counter() - start) * 1000
+        recorder.phases["tls"] += max(0.0, setup - (recorder.phases["dns"] + recorder.phases["connect"] - before))
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools open connections that report setup timings."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
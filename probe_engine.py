@@ -0,0 +1,377 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import requests
+from adaptive_sampling import sample_until_converged
+from phase_timing import PhaseRecorder, TimedHTTPAdapter, average_phases
+from rate_limit import DEFAULT_BACKOFF, MAX_BACKOFF, is_throttled, parse_retry_after
+
+# Security headers to check
+SECURITY_HEADERS = [
+    "Strict-Transport-Security",
+    "Content-Security-Policy",
+    "X-Content-Type-Options",
+    "X-Frame-Options",
+]
+
+# Public endpoints offered in the API picker and by the batch runner, as (url, method); a URL may repeat
+sample_apis = [
+    ("https://reqres.in/api/users", "GET"),
+    ("https://jsonplaceholder.typicode.com/posts", "GET"),
+    ("https://jsonplaceholder.typicode.com/comments", "GET"),
+    ("https://reqres.in/api/users/2", "GET"),
+    ("https://api.openweathermap.org/data/2.5/weather?q=London&appid=demo", "GET"),
+    ("https://gorest.co.in/public/v2/users", "GET"),
+    ("https://petstore.swagger.io/v2/pet", "GET"),
+    ("https://api.agify.io?name=michael", "GET"),
+    ("https://api.genderize.io?name=lucy", "GET"),
+    ("https://api.nationalize.io?name=nathaniel", "GET"),
+    ("https://dog.ceo/api/breeds/image/random", "GET"),
+    ("https://catfact.ninja/fact", "GET"),
+    ("https://official-joke-api.appspot.com/random_joke", "GET"),
+    ("https://randomuser.me/api/", "GET"),
+    ("https://jsonplaceholder.typicode.com/posts", "POST"),
+    ("https://jsonplaceholder.typicode.com/posts/1", "PUT"),
+    ("https://jsonplaceholder.typicode.com/posts/1", "DELETE"),
+]
+
+# Warm samples taken after the cold probe for latency scoring
+WARM_SAMPLES = 3
+
+# Bodies are streamed in chunks of this size and never held in memory
+CHUNK_SIZE = 64 * 1024
+
+# Download speed that earns a full transfer score, and the smallest body worth measuring
+THROUGHPUT_TARGET = 10 * 1024 * 1024
+MIN_THROUGHPUT_BYTES = 64 * 1024
+
+# How long an origin's security-header scan is trusted, and how many URLs' validators are kept
+SECURITY_TTL = 300
+MAX_VALIDATORS = 1024
+
+
+class ProbeResult:
+    """Outcome of a single request: the response (or error), its latency and phase timings.
+
+    ``elapsed_ms`` runs to the last body byte read. The body itself is not
+    kept; ``bytes_read`` counts it and ``truncated`` marks a body cut off by
+    the engine's cap. ``failed`` covers both no response at all and a
+    server error (5xx); 4xx answers are left to the functionality score.
+    ``throttled`` responses (429, or 503 with Retry-After) are answers, not failures, but their
+    latency says nothing about the endpoint, so the scorers leave them out
+    of both; ``retries`` counts throttled attempts before this one.
+    """
+
+    def __init__(self, response=None, elapsed_ms=None, error=None, phases=None, bytes_read=0, truncated=False):
+        self.response = response
+        self.elapsed_ms = elapsed_ms
+        self.error = error
+        self.phases = phases
+        self.bytes_read = bytes_read
+        self.truncated = truncated
+        self.retries = 0
+
+    @property
+    def ok(self):
+        return self.response is not None
+
+    @property
+    def failed(self):
+        return self.response is None or (self.response.status_code >= 500 and not self.throttled)
+
+    @property
+    def throttled(self):
+        return self.response is not None and is_throttled(self.response)
+
+    @property
+    def throughput(self):
+        # Download speed in bytes/s over the transfer phase
+        if not self.bytes_read or not self.phases or self.phases["transfer"] <= 0:
+            return None
+        return self.bytes_read / (self.phases["transfer"] / 1000)
+
+
+class SecurityCache:
+    """Per-origin security-header scans and per-URL cache validators.
+
+    Every full response the engine sees refreshes its origin's scan (which
+    SECURITY_HEADERS it carried), trusted for ``ttl`` seconds. Successful
+    GET/HEAD responses also leave their ETag/Last-Modified behind so the
+    next cold probe of that URL can revalidate instead of downloading the
+    body again; the validators are kept for the most recent
+    ``max_validators`` URLs.
+    """
+
+    def __init__(self, ttl=SECURITY_TTL, max_validators=MAX_VALIDATORS):
+        self.ttl = ttl
+        self.max_validators = max_validators
+        self._scans = {}
+        self._validators = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _origin(url):
+        parts = urlsplit(url)
+        return parts.scheme, parts.netloc
+
+    def observe(self, url, method, response):
+        # A 304 carries no body and often not the full header set; keep the previous scan
+        if response.status_code == 304:
+            return
+        present = frozenset(h for h in SECURITY_HEADERS if h in response.headers)
+        validators = {name: response.headers[header] for name, header in
+                      (("If-None-Match", "ETag"), ("If-Modified-Since", "Last-Modified")) if header in response.headers}
+        with self._lock:
+            self._scans[self._origin(url)] = (time.monotonic() + self.ttl, present)
+            if method in ("GET", "HEAD") and response.status_code == 200:
+                self._validators.pop((method, url), None)
+                if validators:
+                    self._validators[(method, url)] = validators
+                    if len(self._validators) > self.max_validators:
+                        self._validators.popitem(last=False)
+
+    def scan(self, url):
+        """Security headers last seen on this URL's origin, or None once the scan is older than the TTL."""
+        with self._lock:
+            entry = self._scans.get(self._origin(url))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def conditional_headers(self, url, method):
+        with self._lock:
+            return dict(self._validators.get((method, url), {}))
+
+
+class ProbeEngine:
+    """Sends probes over a pooled keep-alive session.
+
+    One engine is meant to live as long as its caller (a window, a batch run)
+    so repeat probes against the same host skip the TCP and TLS handshakes.
+
+    Response bodies are streamed and discarded. ``body_cap`` limits how much
+    is read: None drains the whole body (keeping the connection reusable),
+    0 reads headers only, and N stops at the first chunk boundary at or past
+    N bytes. A body that is not read to the end costs its connection, which
+    is closed rather than pooled.
+
+    ``sink`` (e.g. a sample_log.SampleLog) gets ``log(url, method, result)``
+    for every probe. Responses feed a SecurityCache (``security_ttl``
+    seconds per origin; 0 turns it off) that score_security and
+    conditional probes use.
+
+    A throttled response (429, or 503 with Retry-After) is retried up to
+    ``retries`` times after its Retry-After delay (capped at MAX_BACKOFF;
+    exponential from DEFAULT_BACKOFF without one). Setting ``cancel`` in
+    probe() cuts that wait short and returns the throttled result. With a rate_limit.HostLimiter in
+    ``limiter`` every request first waits for its host's token bucket, and
+    throttling slows that host down for all threads sharing the engine.
+    """
+
+    def __init__(self, pool_size=10, timeout=10, body_cap=None, sink=None, security_ttl=SECURITY_TTL, limiter=None,
+                 retries=2):
+        self.timeout = timeout
+        self.body_cap = body_cap
+        self.sink = sink
+        self.security = SecurityCache(security_ttl) if security_ttl else None
+        self.limiter = limiter
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def probe(self, url, method, headers=None, data=None, conditional=False, cancel=None):
+        """Send one request. With ``conditional``, a GET/HEAD revalidates using
+        the validators cached from the URL's last 200 response, if any."""
+        if conditional and self.security:
+            validators = self.security.conditional_headers(url, method)
+            if validators:
+                headers = {**validators, **(headers or {})}
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire(url, cancel)
+            if attempt and cancel and cancel.is_set():
+                break
+            result = self._probe(url, method, headers, data)
+            result.retries = attempt
+            if self.sink:
+                self.sink.log(url, method, result)
+            if not result.throttled:
+                break
+            delay = parse_retry_after(result.response.headers.get("Retry-After"))
+            delay = min(MAX_BACKOFF, DEFAULT_BACKOFF * 2 ** attempt if delay is None else delay)
+            if self.limiter:
+                self.limiter.throttled(url, delay)
+            if attempt >= self.retries:
+                break
+            attempt += 1
+            if not self.limiter:
+                # With a limiter the next acquire() waits out the host's pause instead
+                if cancel:
+                    cancel.wait(delay)
+                else:
+                    time.sleep(delay)
+        if self.limiter and result.ok and not result.throttled:
+            self.limiter.succeeded(url)
+        if self.security and result.ok:
+            self.security.observe(url, method, result.response)
+        return result
+
+    def _probe(self, url, method, headers, data):
+        with PhaseRecorder() as recorder:
+            try:
+                # Stream so the wait for headers and the body download are timed apart
+                response = self.session.request(method, url, headers=headers, json=data, timeout=self.timeout,
+                                                stream=True)
+                recorder.mark_headers()
+                body_start = time.perf_counter()
+                bytes_read, truncated = self._read_body(response)
+                recorder.add("transfer", time.perf_counter() - body_start)
+            except requests.RequestException as exc:
+                return ProbeResult(elapsed_ms=(time.perf_counter() - recorder.start) * 1000, error=exc,
+                                   phases=recorder.phases)
+        return ProbeResult(response, (time.perf_counter() - recorder.start) * 1000, phases=recorder.phases,
+                           bytes_read=bytes_read, truncated=truncated)
+
+    def _read_body(self, response):
+        cap = self.body_cap
+        bytes_read = 0
+        if cap != 0:
+            for chunk in response.iter_content(CHUNK_SIZE if cap is None else min(CHUNK_SIZE, cap)):
+                bytes_read += len(chunk)
+                if cap is not None and bytes_read >= cap:
+                    break
+            else:
+                return bytes_read, False
+        if getattr(response.raw, "length_remaining", None) == 0:
+            # Already at the end of the body: the cap landed on it, or there was none (204, 304, Content-Length: 0).
+            # The empty read lets http.client mark the response done, so the connection can be reused
+            response.raw.read()
+            response.raw.release_conn()
+            return bytes_read, False
+        # Stopped early: drop the connection instead of returning a half-read one to the pool
+        response.close()
+        return bytes_read, True
+
+    def close(self):
+        self.session.close()
+
+
+def score_functionality(result):
+    if not result.ok:
+        return 0
+    # 304 answers a revalidation: the resource is unchanged since its last 200
+    return 100 if result.response.status_code in (200, 304) else 50
+
+
+def score_reliability(samples):
+    # Average only the successful samples; failures (incl. 5xx) scale the score down instead. Throttled ones count
+    # as neither
+    samples = [s for s in samples if not s.throttled]
+    response_times = [s.elapsed_ms for s in samples if not s.failed]
+    if not response_times:
+        return 0, 1000
+    avg_time = sum(response_times) / len(response_times)
+    reliability_score = max(0, 100 - avg_time / 10) * len(response_times) / len(samples)
+    return round(reliability_score, 2), avg_time
+
+
+def score_performance(avg_time, throughput=None):
+    latency_score = max(0, 100 - avg_time / 10)
+    if throughput is None:
+        return round(latency_score, 2)
+    # Large bodies also get scored on download speed
+    throughput_score = min(100, throughput / THROUGHPUT_TARGET * 100)
+    return round(0.8 * latency_score + 0.2 * throughput_score, 2)
+
+
+def transfer_stats(samples):
+    """Average body size, download throughput and time-to-last-byte of successful samples.
+
+    Throughput is only reported for bodies of at least MIN_THROUGHPUT_BYTES;
+    smaller ones download too quickly for the figure to mean anything.
+    """
+    done = [s for s in samples if not s.failed and not s.throttled]
+    if not done:
+        return None
+    measured = [s.throughput for s in done if s.bytes_read >= MIN_THROUGHPUT_BYTES and s.throughput]
+    return {
+        "bytes": sum(s.bytes_read for s in done) / len(done),
+        "throughput": sum(measured) / len(measured) if measured else None,
+        "ttlb": sum(s.elapsed_ms for s in done) / len(done),
+        "truncated": any(s.truncated for s in done),
+    }
+
+
+def latency_distribution(samples):
+    # Raw latencies and error count (no response or 5xx), as saved for baselines; throttled samples are only counted
+    throttled = sum(1 for s in samples if s.throttled)
+    return {"latencies": [s.elapsed_ms for s in samples if not s.failed and not s.throttled],
+            "errors": sum(1 for s in samples if s.failed), "requests": len(samples) - throttled,
+            "throttled": throttled}
+
+
+def format_transfer(transfer):
+    text = f"{transfer['bytes'] / 1024:.1f} KB"
+    if transfer["truncated"]:
+        text += " (capped)"
+    if transfer["throughput"]:
+        text += f", {transfer['throughput'] / 1024 / 1024:.2f} MB/s"
+    return text + f", TTLB {transfer['ttlb']:.1f} ms"
+
+
+def score_security(url, result, cache=None):
+    if not result.ok:
+        return 0
+    https_check = 100 if url.startswith("https://") else 50
+    # Any recent response from the same origin will do, which also covers a header-less 304
+    present = cache.scan(url) if cache else None
+    if present is None:
+        present = [header for header in SECURITY_HEADERS if header in result.response.headers]
+    return min(100, https_check + 25 * len(present))
+
+
+def run_probe_suite(engine, url, method, headers=None, data=None, warm_samples=WARM_SAMPLES, cancel=None,
+                    adaptive=None):
+    """Score an endpoint from one cold probe plus a few warm samples.
+
+    The cold response feeds the functionality and security scorers; latency is
+    taken from the warm samples so the scores reflect the endpoint rather than
+    connection setup. If the cold probe fails (or is still throttled after
+    the engine's retries) there is nothing to warm up.
+    With an AdaptiveConfig in ``adaptive``, warm samples are taken until the
+    latency estimate converges instead of a fixed ``warm_samples`` count.
+    Setting the ``cancel`` event stops further samples from being sent.
+    The cold probe revalidates a body the engine has already seen (ETag /
+    Last-Modified) instead of downloading it again; warm samples do not.
+    """
+    cold = engine.probe(url, method, headers, data, conditional=True, cancel=cancel)
+    warm = []
+    sampling = None
+    # Still throttled after the engine's retries: warm samples would only be throttled too
+    usable = cold.ok and not cold.throttled
+    if usable and adaptive:
+        warm, sampling = sample_until_converged(lambda: engine.probe(url, method, headers, data, cancel=cancel),
+                                                adaptive, cancel)
+    while usable and not adaptive and len(warm) < warm_samples and not (cancel and cancel.is_set()):
+        warm.append(engine.probe(url, method, headers, data, cancel=cancel))
+
+    samples = warm or [cold]
+    reliability, avg_time = score_reliability(samples)
+    transfer = transfer_stats(samples)
+    return {
+        "functionality": score_functionality(cold),
+        "reliability": reliability,
+        "performance": score_performance(avg_time, transfer and transfer["throughput"]),
+        "security": score_security(url, cold, engine.security),
+        "avg_time": avg_time,
+        "phases": {"cold": cold.phases, "warm": average_phases([s.phases for s in warm if s.ok and not s.throttled])},
+        "transfer": transfer,
+        "sampling": sampling,
+        # Every throttled response, including the ones retried into a success
+        "throttled": sum(s.retries + s.throttled for s in [cold] + warm),
+        "distribution": latency_distribution(samples),
+    }
@@ -0,0 +1,136 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Longest Retry-After honoured, and the backoff used when a throttled response gives none
+MAX_BACKOFF = 30.0
+DEFAULT_BACKOFF = 1.0
+
+
+def is_throttled(response):
+    """Whether a response means "slow down" rather than "broken".
+
+    A 429 always does. A 503 only does when it says when to come back
+    (Retry-After); a bare 503 is an outage and counts as a failure.
+    """
+    if response.status_code == 429:
+        return True
+    return response.status_code == 503 and "Retry-After" in response.headers
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - (now if now is not None else time.time()))
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts of up to ``burst``."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.paused_until = 0.0
+        self.rate_changed = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # Tokens only accrue outside a pause, so waiters queued during one are spaced out after it
+        since = max(self._updated, self.paused_until)
+        if now > since:
+            self.tokens = min(self.burst, self.tokens + (now - since) * self.rate)
+        self._updated = now
+
+    def _reserve(self):
+        # Take a token now (possibly going into debt) and return how long to wait for it
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            debt = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(0.0, self.paused_until - now) + debt
+
+    def acquire(self, cancel=None):
+        # Setting ``cancel`` cuts the wait short
+        wait = self._reserve()
+        if wait > 0:
+            if cancel:
+                cancel.wait(wait)
+            else:
+                time.sleep(wait)
+        return wait
+
+    def set_rate(self, rate):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = rate
+            self.rate_changed = now
+
+    @property
+    def paused(self):
+        return self.paused_until > time.monotonic()
+
+    def pause(self, seconds):
+        """Hold requests for ``seconds``; afterwards one goes at once and the rest follow at ``rate``."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.paused_until = max(self.paused_until, now + seconds)
+            # Any saved-up burst is forfeited, but the first request after the pause needn't wait
+            if self.tokens >= 0:
+                self.tokens = 1.0
+
+
+class HostLimiter:
+    """One token bucket per host, adapting to throttling.
+
+    Each host starts at ``rate`` requests/s. A throttled response halves the
+    host's rate (down to ``min_rate``) and pauses it for the Retry-After
+    delay; other responses throttled during that pause don't halve it
+    again. While responses succeed the rate then climbs back by a tenth of
+    ``rate`` per second. Parallel sweeps therefore settle just under
+    whatever limit a shared gateway enforces.
+    """
+
+    def __init__(self, rate=10.0, burst=5, min_rate=0.5):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def acquire(self, url, cancel=None):
+        """Block until a request to ``url``'s host is allowed (or ``cancel`` is set); returns the seconds waited."""
+        return self.bucket(url).acquire(cancel)
+
+    def throttled(self, url, delay):
+        bucket = self.bucket(url)
+        if not bucket.paused:
+            bucket.set_rate(max(self.min_rate, bucket.rate / 2))
+        bucket.pause(delay)
+
+    def succeeded(self, url):
+        bucket = self.bucket(url)
+        if bucket.rate < self.rate and time.monotonic() - bucket.rate_changed >= 1.0:
+            bucket.set_rate(min(self.rate, bucket.rate + self.rate / 10))
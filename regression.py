@@ -0,0 +1,136 @@
+import math
+from statistics import NormalDist
+
+# Minimum relative slowdown worth flagging, however significant statistically
+MIN_CHANGE = 0.10
+ALPHA = 0.05
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile over an already sorted list
+    if not sorted_values:
+        return None
+    return sorted_values[max(1, math.ceil(pct / 100 * len(sorted_values))) - 1]
+
+
+def mann_whitney_greater(baseline, current):
+    """One-sided Mann-Whitney U test that ``current`` tends to be larger than ``baseline``.
+
+    Uses the normal approximation with tie and continuity corrections.
+    Returns the p-value (1.0 when either side is empty).
+    """
+    n1, n2 = len(baseline), len(current)
+    if not n1 or not n2:
+        return 1.0
+    ranked = sorted([(v, 0) for v in baseline] + [(v, 1) for v in current])
+    rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j < len(ranked) and ranked[j][0] == ranked[i][0]:
+            j += 1
+        # Tied values share the average of the ranks they span
+        average_rank = (i + 1 + j) / 2
+        rank_sum += average_rank * sum(1 for _, side in ranked[i:j] if side == 1)
+        tie_term += (j - i) ** 3 - (j - i)
+        i = j
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 1 - NormalDist().cdf(z)
+
+
+def fisher_greater(base_errors, base_total, errors, total):
+    """One-sided Fisher exact test that the current rate (of errors, or slow samples) is higher than the baseline's."""
+    failed = base_errors + errors
+    population = base_total + total
+    if not total or not failed:
+        return 1.0
+    denominator = math.comb(population, failed)
+    return min(1.0, sum(math.comb(total, k) * math.comb(base_total, failed - k)
+                        for k in range(errors, min(total, failed) + 1)) / denominator)
+
+
+class Check:
+    def __init__(self, metric, baseline, current, p_value, regressed):
+        self.metric = metric
+        self.baseline = baseline
+        self.current = current
+        self.p_value = p_value
+        self.regressed = regressed
+
+    def summary(self):
+        unit = "" if self.metric == "error rate" else " ms"
+        fmt = "{:.1%}" if self.metric == "error rate" else "{:.1f}"
+        values = (f"{fmt.format(self.baseline)}{unit} -> {fmt.format(self.current)}{unit}"
+                  if self.baseline is not None and self.current is not None else "no data")
+        flag = "REGRESSION" if self.regressed else "ok"
+        return f"{self.metric} {values} (p={self.p_value:.3g}) {flag}"
+
+
+class Comparison:
+    # ``inconclusive``: the run had nothing to compare (e.g. every response throttled), which a gate must not pass
+    def __init__(self, url, method, checks, note=None, inconclusive=False):
+        self.url = url
+        self.method = method
+        self.checks = checks
+        self.note = note
+        self.inconclusive = inconclusive
+
+    @property
+    def regressed(self):
+        return any(check.regressed for check in self.checks)
+
+    def summary(self):
+        if self.note:
+            return self.note
+        return "; ".join(check.summary() for check in self.checks)
+
+
+def compare(url, method, baseline, current, alpha=ALPHA, min_change=MIN_CHANGE):
+    """Compare a run with an endpoint's baseline.
+
+    ``baseline`` and ``current`` are dicts with ``latencies`` (successful
+    latencies in ms), ``errors`` and ``requests``. A metric regresses when
+    its test is significant at ``alpha`` and it is also at least
+    ``min_change`` worse. A run without a single counted request is
+    ``inconclusive`` rather than ok:
+
+    * p50: Mann-Whitney U on the two latency samples.
+    * p95: Fisher exact test on the share of samples above the baseline
+      p95, in the baseline against the current run.
+    * error rate: Fisher exact test on the error counts.
+    """
+    if baseline is None:
+        return Comparison(url, method, [], "no baseline saved")
+    if not current["requests"]:
+        throttled = current.get("throttled", 0)
+        note = f"every response was throttled ({throttled})" if throttled else "no requests were made"
+        return Comparison(url, method, [], f"{note}; nothing to compare", inconclusive=True)
+    base_latencies = sorted(baseline["latencies"])
+    latencies = sorted(current["latencies"])
+    checks = []
+
+    base_p50, p50 = percentile(base_latencies, 50), percentile(latencies, 50)
+    p_value = mann_whitney_greater(base_latencies, latencies)
+    checks.append(Check("p50", base_p50, p50, p_value, p_value < alpha and p50 is not None
+                        and base_p50 is not None and p50 > base_p50 * (1 + min_change)))
+
+    base_p95, p95 = percentile(base_latencies, 95), percentile(latencies, 95)
+    p_value = 1.0
+    if base_p95 is not None and latencies:
+        p_value = fisher_greater(sum(1 for v in base_latencies if v > base_p95), len(base_latencies),
+                                 sum(1 for v in latencies if v > base_p95), len(latencies))
+    checks.append(Check("p95", base_p95, p95, p_value, p_value < alpha and p95 is not None
+                        and base_p95 is not None and p95 > base_p95 * (1 + min_change)))
+
+    base_rate = baseline["errors"] / baseline["requests"] if baseline["requests"] else 0.0
+    rate = current["errors"] / current["requests"] if current["requests"] else 0.0
+    p_value = fisher_greater(baseline["errors"], baseline["requests"], current["errors"], current["requests"])
+    checks.append(Check("error rate", base_rate, rate, p_value,
+                        p_value < alpha and rate - base_rate >= max(min_change * base_rate, 0.01)))
+    return Comparison(url, method, checks)
@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = "test_history.db"
+
+SCORE_COLUMNS = ["functionality", "reliability", "performance", "security", "avg_time"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    url TEXT NOT NULL,
+    method TEXT NOT NULL,
+    functionality REAL,
+    reliability REAL,
+    performance REAL,
+    security REAL,
+    avg_time REAL,
+    phases TEXT
+);
+CREATE INDEX IF NOT EXISTS results_endpoint_ts ON results (url, method, ts);
+CREATE INDEX IF NOT EXISTS results_ts ON results (ts);
+CREATE TABLE IF NOT EXISTS baselines (
+    url TEXT NOT NULL,
+    method TEXT NOT NULL,
+    ts REAL NOT NULL,
+    latencies TEXT NOT NULL,
+    errors INTEGER NOT NULL,
+    requests INTEGER NOT NULL,
+    PRIMARY KEY (url, method)
+);
+"""
+
+
+def record_from_results(url, method, results, ts=None):
+    """Flatten a run_probe_suite / run_load_suite result into a store record."""
+    record = {"ts": ts if ts is not None else time.time(), "url": url, "method": method}
+    for column in SCORE_COLUMNS:
+        record[column] = results.get(column)
+    record["phases"] = results.get("phases")
+    return record
+
+
+class ResultStore:
+    """SQLite-backed test history, indexed by endpoint and time.
+
+    The database runs in WAL mode so the history view can read while probe
+    workers write. One connection is shared behind a lock; callers from any
+    thread should prefer add_many for a batch of results, which commits them
+    in a single transaction.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def add(self, record):
+        self.add_many([record])
+
+    def add_many(self, records):
+        rows = [(r["ts"], r["url"], r["method"], *(r.get(c) for c in SCORE_COLUMNS),
+                 json.dumps(r["phases"]) if r.get("phases") is not None else None) for r in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO results (ts, url, method, functionality, reliability, performance, security, avg_time, "
+                "phases) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _where(self, url, method, start, end):
+        clauses, params = [], []
+        for clause, value in (("url = ?", url), ("method = ?", method), ("ts >= ?", start), ("ts < ?", end)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _fetch(self, sql, params):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        records = []
+        for row in rows:
+            record = dict(row)
+            record["phases"] = json.loads(record["phases"]) if record["phases"] else None
+            records.append(record)
+        return records
+
+    def page(self, page=0, page_size=50, url=None, method=None, start=None, end=None):
+        """Newest-first slice of the history, optionally filtered."""
+        where, params = self._where(url, method, start, end)
+        return self._fetch(f"SELECT * FROM results{where} ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?",
+                           params + [page_size, page * page_size])
+
+    def between(self, start, end=None, url=None, method=None):
+        """All results in [start, end), oldest first, for trend queries."""
+        where, params = self._where(url, method, start, end)
+        return self._fetch(f"SELECT * FROM results{where} ORDER BY ts, id", params)
+
+    def count(self, url=None, method=None, start=None, end=None):
+        where, params = self._where(url, method, start, end)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def save_baselines(self, baselines, ts=None):
+        """Replace the saved baseline of each (url, method, distribution) entry.
+
+        A distribution is the ``distribution`` entry of a suite result: the
+        successful latencies plus error and request counts.
+        """
+        ts = ts if ts is not None else time.time()
+        rows = [(url, method, ts, json.dumps(d["latencies"]), d["errors"], d["requests"])
+                for url, method, d in baselines]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO baselines (url, method, ts, latencies, errors, requests) "
+                                   "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def baseline(self, url, method):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM baselines WHERE url = ? AND method = ?",
+                                     (url, method)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record["latencies"] = json.loads(record["latencies"])
+        return record
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,130 @@
+import csv
+import io
+import json
+import os
+import queue
+import threading
+import time
+
+FIELDS = ["ts", "url", "method", "status", "latency_ms", "bytes", "error"]
+FORMATS = ["jsonl", "csv"]
+
+# Sentinel that tells the writer thread to flush and stop
+_STOP = object()
+
+
+def record_from_result(url, method, result, ts=None):
+    """One log record for a ProbeResult; ``error`` is the exception class name."""
+    return {
+        "ts": ts if ts is not None else time.time(),
+        "url": url,
+        "method": method,
+        "status": result.response.status_code if result.ok else None,
+        "latency_ms": round(result.elapsed_ms, 3) if result.elapsed_ms is not None else None,
+        "bytes": result.bytes_read,
+        "error": type(result.error).__name__ if result.error is not None else None,
+    }
+
+
+class SampleLog:
+    """Streams one record per probe to a rotating JSONL or CSV file.
+
+    ``log`` only puts the record on a bounded queue; a background thread
+    writes it through a buffered file, so probe threads never wait on disk
+    and nothing is held in memory beyond the queue. If the writer falls
+    ``queue_size`` records behind, ``log`` blocks until it catches up
+    rather than dropping records. Once the file passes ``max_bytes`` it is
+    renamed to ``path.1`` (older ones shift up to ``path.<backups>``) and a
+    fresh file is started; CSV files each get their own header row.
+    """
+
+    def __init__(self, path, fmt=None, max_bytes=50 * 1024 * 1024, backups=5, queue_size=10000):
+        fmt = fmt or ("csv" if path.lower().endswith(".csv") else "jsonl")
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {FORMATS}")
+        self.path = path
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue_size = queue_size
+        self.written = 0
+        self._queue = queue.Queue(queue_size)
+        self._file = None
+        self._size = 0
+        # CSV rows are formatted here first so their size is known without flushing the file
+        self._row = io.StringIO()
+        self._csv = csv.DictWriter(self._row, FIELDS)
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="sample-log", daemon=True)
+        self._thread.start()
+
+    def part(self, index):
+        """Settings for a separate log file (``name.p<index>.ext``), e.g. one per worker process."""
+        root, ext = os.path.splitext(self.path)
+        return {"path": f"{root}.p{index}{ext}", "fmt": self.fmt, "max_bytes": self.max_bytes,
+                "backups": self.backups, "queue_size": self.queue_size}
+
+    def log(self, url, method, result):
+        self._queue.put(record_from_result(url, method, result))
+
+    def _open(self):
+        self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self._file = open(self.path, "a", encoding="utf-8", newline="", buffering=1024 * 1024)
+        if self.fmt == "csv" and not self._size:
+            self._emit(self._csv.writeheader)
+
+    def _emit(self, write_row, *args):
+        write_row(*args)
+        line = self._row.getvalue()
+        self._row.seek(0)
+        self._row.truncate()
+        self._write_line(line)
+
+    def _write_line(self, line):
+        self._file.write(line)
+        # Bytes, not characters: CSV rows can hold non-ASCII URLs
+        self._size += len(line.encode("utf-8"))
+
+    def _rotate(self):
+        self._file.close()
+        if self.backups:
+            for n in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{n}"):
+                    os.replace(f"{self.path}.{n}", f"{self.path}.{n + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _write(self, record):
+        if self.fmt == "csv":
+            self._emit(self._csv.writerow, record)
+        else:
+            self._write_line(json.dumps(record) + "\n")
+        self.written += 1
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                break
+            self._write(record)
+            # Checked after every record: under steady logging the queue never empties
+            if self._size >= self.max_bytes:
+                self._rotate()
+            elif self._queue.empty():
+                # Flush only once caught up, so a backlog goes to disk in large writes
+                self._file.flush()
+        self._file.close()
+
+    def close(self):
+        """Write out everything queued so far and close the file."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,95 +1,473 @@
 from selenium import webdriver
+from selenium.common.exceptions import ElementClickInterceptedException, SessionNotCreatedException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support.ui import Select, WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import argparse
+import json
+import os
+import sys
+import threading
 import time
 
-# Setup WebDriver
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-driver.maximize_window()
-driver.get("https://demoqa.com/automation-practice-form")
-
-# Remove all iframes (ads) that might block clicks
-driver.execute_script("""
-    var iframes = document.getElementsByTagName('iframe');
-    while(iframes.length > 0) {
-        iframes[0].parentNode.removeChild(iframes[0]);
-    }
-""")
-
-# Close fixed banner if exists
-try:
-    WebDriverWait(driver, 5).until(
-        EC.element_to_be_clickable((By.ID, "close-fixedban"))
-    ).click()
-except:
-    pass
-
-# Fill in basic details
-driver.find_element(By.ID, "firstName").send_keys("Omkar")
-driver.find_element(By.ID, "lastName").send_keys("Sanas")
-driver.find_element(By.ID, "userEmail").send_keys("omkar@example.com")
-
-# Handle gender click with scroll and fallback
-gender_male = driver.find_element(By.XPATH, "//label[text()='Male']")
-driver.execute_script("arguments[0].scrollIntoView(true);", gender_male)
-time.sleep(1)
-try:
-    gender_male.click()
-except:
-    # If label click blocked, click the actual radio input
-    driver.find_element(By.ID, "gender-radio-1").click()
-
-# Mobile number
-driver.find_element(By.ID, "userNumber").send_keys("9876543210")
-
-# Date of Birth - scroll into view and click
-dob_input = driver.find_element(By.ID, "dateOfBirthInput")
-driver.execute_script("arguments[0].scrollIntoView(true);", dob_input)
-time.sleep(1)
-dob_input.click()
-
-# Select year, month, day
-driver.find_element(By.CLASS_NAME, "react-datepicker__year-select").send_keys("2000")
-driver.find_element(By.CLASS_NAME, "react-datepicker__month-select").send_keys("May")
-driver.find_element(By.XPATH, "//div[contains(@class,'react-datepicker__day--015') and not(contains(@class,'react-datepicker__day--outside-month'))]").click()
-
-# Subject
-subject = driver.find_element(By.ID, "subjectsInput")
-subject.send_keys("Maths")
-subject.send_keys("\n")
-
-# Scroll down to hobbies
-driver.execute_script("window.scrollBy(0, 300)")
-
-# Hobbies - scroll and click
-reading_checkbox = driver.find_element(By.XPATH, "//label[text()='Reading']")
-driver.execute_script("arguments[0].scrollIntoView(true);", reading_checkbox)
-reading_checkbox.click()
-
-# Upload Picture - using your specified path
-driver.find_element(By.ID, "uploadPicture").send_keys(r"C:\Users\Omkar\Pictures\sample.jpg")
-
-# Current Address
-driver.find_element(By.ID, "currentAddress").send_keys("123, Pune, Maharashtra")
-
-# Scroll down to state and city dropdowns
-driver.execute_script("window.scrollBy(0, 300)")
-
-# Select State and City using inputs and Enter key
-state = driver.find_element(By.ID, "react-select-3-input")
-state.send_keys("NCR\n")
-
-city = driver.find_element(By.ID, "react-select-4-input")
-city.send_keys("Delhi\n")
-
-# Submit the form
-driver.find_element(By.ID, "submit").click()
-
-# Wait to observe submission
-time.sleep(3)
-
-# Close browser
-driver.quit()
+CONFIG_PATH = "config.json"
+TESTDATA_PATH = "testdata.json"
+DEFAULT_WORKERS = 4
+# Driver binaries resolved on earlier runs, by browser, so later runs skip the version lookup
+DRIVER_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".wdm", "form_runner_drivers.json")
+
+# Ad and tracker URLs demoqa pulls in; blocked in Chrome unless config.json sets its own "block_urls"
+BLOCKED_URLS = [
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*adservice.google.*",
+    "*googletagservices.com*",
+    "*googletagmanager.com*",
+    "*google-analytics.com*",
+    "*amazon-adsystem.com*",
+    "*adsafeprotected.com*",
+    "*pubmatic.com*",
+    "*criteo.com*",
+    "*taboola.com*",
+    "*ezoic*",
+]
+PAGE_LOAD_STRATEGIES = ["normal", "eager", "none"]
+
+# arguments[0]: {element id: value} for inputs/textareas; arguments[1]: label texts of radios/checkboxes to tick.
+# Returns whatever it could not find.
+FAST_FILL_SCRIPT = """
+const [values, labels] = arguments;
+const missing = [];
+for (const [id, value] of Object.entries(values)) {
+    const field = document.getElementById(id);
+    if (!field) { missing.push(id); continue; }
+    const proto = field instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(field, value);
+    field.dispatchEvent(new Event('input', {bubbles: true}));
+}
+const allLabels = Array.from(document.querySelectorAll('label'));
+for (const text of labels) {
+    const label = allLabels.find(l => l.textContent.trim() === text);
+    const input = label && document.getElementById(label.htmlFor);
+    if (!input) { missing.push(text); continue; }
+    if (!input.checked) input.click();
+}
+return missing;
+"""
+
+_driver_paths = {}
+_driver_lock = threading.Lock()
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_records(path=TESTDATA_PATH):
+    # testdata.json holds a list of form records; a single object is one record
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def upload_path(record, config):
+    """Absolute path of the picture to upload for ``record`` (its own or config.json's), or None.
+
+    Relative paths are taken from the working directory. A path that isn't a
+    file raises FileNotFoundError here, before any browser time is spent.
+    """
+    path = record.get("upload_image_path", config.get("upload_image_path"))
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"upload image {path} not found; fix upload_image_path in the config or record")
+    return path
+
+
+def _read_driver_cache():
+    try:
+        with open(DRIVER_CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def driver_path(browser, refresh=False):
+    """Path of the driver binary for ``browser``, looked up once per process.
+
+    A path remembered from an earlier run is used as is, without asking
+    webdriver-manager (which checks the installed browser version and may
+    go to the network). ``refresh`` forces that lookup, e.g. after a
+    browser upgrade left the cached driver behind.
+    """
+    with _driver_lock:
+        if not refresh and browser in _driver_paths:
+            return _driver_paths[browser]
+        cache = _read_driver_cache()
+        path = cache.get(browser)
+        if refresh or not path or not os.path.exists(path):
+            if browser == "firefox":
+                from webdriver_manager.firefox import GeckoDriverManager
+                path = GeckoDriverManager().install()
+            else:
+                from webdriver_manager.chrome import ChromeDriverManager
+                path = ChromeDriverManager().install()
+            cache[browser] = path
+            os.makedirs(os.path.dirname(DRIVER_CACHE_PATH), exist_ok=True)
+            with open(DRIVER_CACHE_PATH, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2)
+        _driver_paths[browser] = path
+        return path
+
+
+def _start_browser(browser, headless, path, page_load_strategy):
+    if browser == "firefox":
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+        options = webdriver.FirefoxOptions()
+        options.page_load_strategy = page_load_strategy
+        if headless:
+            options.add_argument("-headless")
+        return webdriver.Firefox(service=FirefoxService(path), options=options)
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = page_load_strategy
+    if headless:
+        options.add_argument("--headless=new")
+    return webdriver.Chrome(service=Service(path), options=options)
+
+
+def block_urls(driver, patterns):
+    """Have Chrome refuse requests matching ``patterns`` (``*`` wildcards) before they are sent.
+
+    Uses DevTools network request blocking, so only Chromium-based drivers
+    can do it; returns False when the driver has no DevTools access.
+    """
+    if not patterns or not hasattr(driver, "execute_cdp_cmd"):
+        return False
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    return True
+
+
+def make_driver(config):
+    """Start a browser as configured: ``browser`` chrome or firefox, headless unless ``headless`` is false.
+
+    ``driver_path`` in the config pins the driver binary; otherwise it comes
+    from driver_path(). ``page_load_strategy`` "eager" returns from page
+    loads at DOMContentLoaded instead of waiting for every image and
+    frame. In Chrome, requests matching ``block_urls`` (BLOCKED_URLS by
+    default, [] to allow everything) are never made; ``driver.blocking``
+    records whether that is in effect.
+    """
+    browser = config.get("browser", "chrome").lower()
+    headless = config.get("headless", True)
+    strategy = config.get("page_load_strategy", "normal")
+    if browser not in ("chrome", "firefox"):
+        raise ValueError(f"unsupported browser {browser!r}")
+    if strategy not in PAGE_LOAD_STRATEGIES:
+        raise ValueError(f"page_load_strategy must be one of {PAGE_LOAD_STRATEGIES}")
+    if config.get("driver_path"):
+        driver = _start_browser(browser, headless, config["driver_path"], strategy)
+    else:
+        try:
+            driver = _start_browser(browser, headless, driver_path(browser), strategy)
+        except SessionNotCreatedException:
+            # Usually a cached driver that no longer matches the browser version
+            driver = _start_browser(browser, headless, driver_path(browser, refresh=True), strategy)
+    driver.blocking = block_urls(driver, config.get("block_urls", BLOCKED_URLS))
+    # Headless windows start small; the form needs room so its fields aren't covered
+    driver.set_window_size(1920, 1080)
+    # Waits are explicit (PracticeFormPage); an implicit wait would stall every find_elements that finds nothing
+    driver.implicitly_wait(0)
+    return driver
+
+
+class PracticeFormPage:
+    """Page object for the demoqa automation practice form.
+
+    Every interaction waits for its element to be ready (up to ``timeout``
+    seconds) instead of sleeping, and each step's duration is recorded in
+    ``timings`` (seconds, monotonic clock). ``current_step`` names the step
+    in progress, so a failure can say where it happened. Ad iframes are
+    removed after loading only when the browser isn't already blocking
+    them (``blocking``).
+    """
+
+    def __init__(self, driver, url, timeout=10, blocking=False):
+        self.driver = driver
+        self.url = url
+        self.blocking = blocking
+        self.wait = WebDriverWait(driver, timeout)
+        self.timings = {}
+        self.current_step = None
+
+    @contextmanager
+    def step(self, name):
+        self.current_step = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def scroll_to(self, element):
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+
+    def click(self, locator):
+        element = self.wait.until(EC.element_to_be_clickable(locator))
+        self.scroll_to(element)
+        try:
+            element.click()
+        except ElementClickInterceptedException:
+            # An overlay (ad, banner) is on top; click it from script instead
+            self.driver.execute_script("arguments[0].click();", element)
+
+    def type(self, locator, text):
+        self.wait.until(EC.visibility_of_element_located(locator)).send_keys(text)
+
+    def choose_option(self, input_id, text, option_prefix):
+        # react-select: type, wait for the matching option to show, then pick it
+        field = self.wait.until(EC.element_to_be_clickable((By.ID, input_id)))
+        self.scroll_to(field)
+        field.send_keys(text)
+        self.wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, f"[id^='{option_prefix}']")))
+        field.send_keys(Keys.ENTER)
+
+    def open(self):
+        with self.step("page load"):
+            self.driver.get(self.url)
+            self.wait.until(EC.visibility_of_element_located((By.ID, "firstName")))
+
+        with self.step("ads"):
+            if not self.blocking:
+                # Remove all iframes (ads) that might block clicks
+                self.driver.execute_script("""
+                    var iframes = document.getElementsByTagName('iframe');
+                    while(iframes.length > 0) {
+                        iframes[0].parentNode.removeChild(iframes[0]);
+                    }
+                """)
+            # Close fixed banner if exists
+            for banner in self.driver.find_elements(By.ID, "close-fixedban"):
+                if banner.is_displayed():
+                    banner.click()
+
+    def fast_fill(self, values, labels):
+        """Set text fields and tick radio/checkbox labels in one script call.
+
+        Values go through the native value setter, followed by an input
+        event, so React's state sees them just as if they were typed.
+        """
+        missing = self.driver.execute_script(FAST_FILL_SCRIPT, values, labels)
+        if missing:
+            raise ValueError(f"fast fill found no field for {', '.join(missing)}")
+
+    def fill(self, record, upload_path, fast=False):
+        hobbies = record.get("hobbies", ["Reading"])
+        if fast:
+            with self.step("basic fields"):
+                self.fast_fill({"firstName": record["first_name"], "lastName": record["last_name"],
+                                "userEmail": record["email"], "userNumber": record["mobile_number"],
+                                "currentAddress": record["address"]},
+                               [record.get("gender", "Male")] + hobbies)
+        else:
+            with self.step("basic fields"):
+                self.type((By.ID, "firstName"), record["first_name"])
+                self.type((By.ID, "lastName"), record["last_name"])
+                self.type((By.ID, "userEmail"), record["email"])
+                self.click((By.XPATH, f"//label[text()='{record.get('gender', 'Male')}']"))
+                self.type((By.ID, "userNumber"), record["mobile_number"])
+
+        # The datepicker, react-select dropdowns and file input need real interaction either way
+        with self.step("datepicker"):
+            dob = record["dob"]
+            self.click((By.ID, "dateOfBirthInput"))
+            Select(self.wait.until(EC.visibility_of_element_located(
+                (By.CLASS_NAME, "react-datepicker__year-select")))).select_by_visible_text(str(dob["year"]))
+            Select(self.driver.find_element(By.CLASS_NAME, "react-datepicker__month-select")) \
+                .select_by_visible_text(dob["month"])
+            self.click((By.XPATH, f"//div[contains(@class,'react-datepicker__day--{int(dob['day']):03d}') "
+                                  f"and not(contains(@class,'react-datepicker__day--outside-month'))]"))
+
+        with self.step("subject"):
+            self.choose_option("subjectsInput", record["subject"], "react-select-2-option")
+
+        if not fast:
+            with self.step("hobbies"):
+                for hobby in hobbies:
+                    self.click((By.XPATH, f"//label[text()='{hobby}']"))
+
+        if upload_path:
+            with self.step("upload"):
+                self.driver.find_element(By.ID, "uploadPicture").send_keys(upload_path)
+
+        if not fast:
+            with self.step("address"):
+                self.type((By.ID, "currentAddress"), record["address"])
+
+        with self.step("state and city"):
+            self.choose_option("react-select-3-input", record["state"], "react-select-3-option")
+            self.choose_option("react-select-4-input", record["city"], "react-select-4-option")
+
+    def submit(self):
+        with self.step("submit"):
+            self.click((By.ID, "submit"))
+            # The confirmation modal only opens once the form validated and submitted
+            self.wait.until(EC.visibility_of_element_located((By.ID, "example-modal-sizes-title-lg")))
+
+
+class FormRunner:
+    """Submits records over a pool of browser sessions, one per worker thread.
+
+    Sessions are started on first use and kept for the whole run; between
+    records the form is reset by loading the page again rather than by
+    restarting the browser. A session that fails a record is quit and
+    replaced on the worker's next record, in case the browser itself broke.
+    """
+
+    def __init__(self, config, workers=DEFAULT_WORKERS):
+        self.config = config
+        self.workers = max(1, workers)
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _driver(self):
+        driver = getattr(self._local, "driver", None)
+        if driver is None:
+            driver = make_driver(self.config)
+            self._local.driver = driver
+            with self._lock:
+                self._drivers.append(driver)
+        return driver
+
+    def _discard_driver(self):
+        driver = getattr(self._local, "driver", None)
+        self._local.driver = None
+        if driver is not None:
+            with self._lock:
+                self._drivers.remove(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def submit(self, index, record):
+        """Fill and submit one record; returns the record's result and timing."""
+        start = time.perf_counter()
+        result = {"record": index, "name": f"{record.get('first_name', '')} {record.get('last_name', '')}".strip(),
+                  "ok": False, "error": None, "startup_seconds": 0.0, "steps": {}}
+        page = None
+        try:
+            upload = upload_path(record, self.config)
+            if getattr(self._local, "driver", None) is None:
+                self._driver()
+                result["startup_seconds"] = round(time.perf_counter() - start, 3)
+            driver = self._driver()
+            page = PracticeFormPage(driver, self.config["base_url"], self.config.get("implicit_wait", 10),
+                                    getattr(driver, "blocking", False))
+            page.open()
+            page.fill(record, upload, self.config.get("fast_fill", False))
+            page.submit()
+            result["ok"] = True
+        except Exception as exc:
+            # WebDriver exceptions keep the bare message in .msg; str() adds "Message:" and a stack trace
+            text = (getattr(exc, "msg", None) if hasattr(exc, "msg") else str(exc)) or ""
+            message = text.strip().splitlines()[0] if text.strip() else ""
+            where = f"{page.current_step}: " if page and page.current_step else ""
+            result["error"] = f"{where}{type(exc).__name__} {message}".strip()
+            self._discard_driver()
+        if page:
+            result["steps"] = page.timings
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    def run(self, records):
+        """Submit every record, ``workers`` sessions at a time; results come back in record order."""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda item: self.submit(*item), enumerate(records)))
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+def format_step_times(results):
+    # Mean and slowest time of each step over the submitted records, slowest step first
+    steps = {}
+    for result in results:
+        if result["ok"]:
+            for name, seconds in result["steps"].items():
+                steps.setdefault(name, []).append(seconds)
+    if not steps:
+        return "No step timings (no record was submitted)"
+    lines = ["Step times (mean / max):"]
+    for name, times in sorted(steps.items(), key=lambda item: -sum(item[1]) / len(item[1])):
+        lines.append(f"  {name:<16} {sum(times) / len(times):>6.2f}s / {max(times):.2f}s")
+    return "\n".join(lines)
+
+
+def run_records(config, records, workers=DEFAULT_WORKERS):
+    runner = FormRunner(config, workers)
+    try:
+        return runner.run(records)
+    finally:
+        runner.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Submit the practice form once per test data record.")
+    parser.add_argument("--config", default=CONFIG_PATH, help=f"browser and URL settings (default {CONFIG_PATH})")
+    parser.add_argument("--data", default=TESTDATA_PATH, help=f"form records (default {TESTDATA_PATH})")
+    parser.add_argument("--workers", type=int, help=f"browsers run in parallel (default config "
+                                                    f"'workers' or {DEFAULT_WORKERS})")
+    parser.add_argument("--headed", action="store_true", help="show the browser windows")
+    parser.add_argument("--eager", action="store_true", help="don't wait for images and frames on page loads")
+    parser.add_argument("--no-block", action="store_true", help="let ad and tracker requests through")
+    parser.add_argument("--fast-fill", action="store_true",
+                        help="set the plain fields with one script call instead of typing into each")
+    parser.add_argument("--json", dest="json_out", help="write the per-record results to this JSON file")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.headed:
+        config["headless"] = False
+    if args.eager:
+        config["page_load_strategy"] = "eager"
+    if args.no_block:
+        config["block_urls"] = []
+    if args.fast_fill:
+        config["fast_fill"] = True
+    records = load_records(args.data)
+    workers = args.workers or config.get("workers", DEFAULT_WORKERS)
+
+    start = time.perf_counter()
+    results = run_records(config, records, workers)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        status = "ok" if result["ok"] else f"FAILED {result['error']}"
+        startup = f" (browser start {result['startup_seconds']:.2f}s)" if result["startup_seconds"] else ""
+        print(f"#{result['record']:<4} {result['seconds']:>7.2f}s  {result['name']:<24} {status}{startup}")
+    passed = sum(1 for r in results if r["ok"])
+    print(f"{passed}/{len(results)} submitted in {elapsed:.1f}s with {workers} workers")
+    print(format_step_times(results))
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0 if passed == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+import random
+from types import SimpleNamespace
+
+from adaptive_sampling import AdaptiveConfig, bounded_sample_count, quantile_interval, sample_until_converged
+from probe_engine import ProbeResult
+
+
+def test_bounded_sample_counts():
+    for quantile, n in [(50, 8), (90, 35), (95, 73), (99, 381)]:
+        assert bounded_sample_count(quantile, 0.95) == n
+        assert quantile_interval(list(range(n)), quantile, 0.95)[3]
+        assert not quantile_interval(list(range(n - 1)), quantile, 0.95)[3]
+
+
+def test_budget_is_raised_to_what_the_quantile_needs():
+    assert AdaptiveConfig(95, max_samples=50).max_samples == 73
+    assert AdaptiveConfig(50, max_samples=50).max_samples == 50
+
+
+def test_p95_converges_with_default_budget():
+    rng = random.Random(3)
+
+    def probe():
+        return ProbeResult(SimpleNamespace(status_code=200, headers={}), rng.uniform(100, 104))
+
+    samples, report = sample_until_converged(probe, AdaptiveConfig(95, rel_width=0.05))
+    assert report.converged and report.bounded
+    assert len(samples) >= 73
@@ -0,0 +1,60 @@
+import random
+
+from histogram import SUB_BUCKETS, LatencyHistogram
+
+
+def test_small_values_are_exact():
+    for value in range(SUB_BUCKETS):
+        assert LatencyHistogram._index(value) == value
+        assert LatencyHistogram._value(value) == value
+
+
+def test_bucket_boundaries():
+    index = LatencyHistogram._index
+    # 128..255 share buckets pairwise, 256..511 in fours
+    assert index(128) == index(129) != index(130)
+    assert index(255) != index(256)
+    assert index(256) == index(259) != index(260)
+    previous = -1
+    for value in range(0, 1 << 16, 7):
+        assert index(value) >= previous
+        previous = index(value)
+
+
+def test_bucket_values_are_within_precision():
+    for value in [128, 129, 1000, 12_345, 999_999, 59_999_999]:
+        represented = LatencyHistogram._value(LatencyHistogram._index(value))
+        assert abs(represented - value) / value <= 1 / 64
+
+
+def test_percentiles_track_exact_ones():
+    rng = random.Random(1)
+    values = sorted(rng.lognormvariate(3, 1) for _ in range(5000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    for pct in (50, 90, 99):
+        exact = values[-(-len(values) * pct // 100) - 1]
+        assert abs(histogram.percentile(pct) - exact) / exact < 0.02
+    assert histogram.max == int(values[-1] * 1000) / 1000
+
+
+def test_overflow_is_clamped_and_counted():
+    histogram = LatencyHistogram(max_ms=10)
+    histogram.record(50)
+    assert histogram.overflow == 1
+    assert histogram.max == 10
+
+
+def test_merge_equals_recording_everything_in_one():
+    rng = random.Random(2)
+    a, b, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(2000):
+        value = rng.expovariate(1 / 40)
+        (a if i % 3 else b).record(value)
+        combined.record(value)
+    a.merge(b)
+    assert list(a.counts) == list(combined.counts)
+    assert (a.total, a.sum_us, a.min_us, a.max_seen_us) == \
+        (combined.total, combined.sum_us, combined.min_us, combined.max_seen_us)
+    assert a.percentile(99) == combined.percentile(99)
@@ -0,0 +1,47 @@
+import asyncio
+from types import SimpleNamespace
+
+from load_profiles import Stage, _run_timetable, constant, step
+from probe_engine import ProbeResult
+
+
+class StubEngine:
+    def __init__(self, status=200):
+        self.status = status
+
+    def probe(self, url, method, headers=None, data=None):
+        return ProbeResult(SimpleNamespace(status_code=self.status, headers={}), 1.0)
+
+
+def run(stages, engine):
+    return asyncio.run(_run_timetable(engine, "http://stub/", "GET", None, None, stages, 8, None, None))
+
+
+def test_arrivals_follow_the_rate():
+    assert len(list(Stage("s", 1, 10).arrivals())) == 10
+    assert 9 <= len(list(Stage("s", 2, 0, 10).arrivals())) <= 11
+
+
+def test_achieved_rate_is_measured_from_sends():
+    report = run(constant(200, 0.5), StubEngine())
+    stage = report.stages[0]
+    assert stage.requests == 100
+    assert 180 < stage.achieved_rps < 220
+
+
+def test_breaking_point_sees_server_errors():
+    report = run(step(20, 40, 2, 0.25), StubEngine(status=500))
+    assert report.stages[0].error_rate == 1.0
+    assert report.breaking_point(1000) is report.stages[0]
+    assert run(step(20, 40, 2, 0.25), StubEngine()).breaking_point(1000) is None
+
+
+def test_finished_requests_are_not_kept():
+    tasks = []
+
+    def on_sample(offset, result, latency):
+        tasks.append(len(asyncio.all_tasks()))
+
+    asyncio.run(_run_timetable(StubEngine(), "http://stub/", "GET", None, None, constant(500, 1), 8, on_sample, None))
+    # The main task plus whatever is in flight, not one task per request sent so far
+    assert max(tasks) < 50
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from load_test import DEFAULT_REQUESTS, LoadConfig, LoadStats
+from probe_engine import ProbeResult
+
+
+def answer(status, elapsed_ms=10.0, headers=None):
+    return ProbeResult(SimpleNamespace(status_code=status, headers=headers or {}), elapsed_ms)
+
+
+def test_server_errors_count_as_errors_not_latencies():
+    stats = LoadStats()
+    for status in (200, 200, 500, 502, 404):
+        stats.add(answer(status))
+    stats.add(ProbeResult(error=OSError("reset")))
+    assert stats.errors == 3
+    assert stats.latency.total == 3
+    assert stats.error_rate == 0.5
+
+
+def test_duration_runs_have_no_request_cap():
+    assert LoadConfig(workers=4, duration=1).total_requests is None
+    assert LoadConfig().total_requests == DEFAULT_REQUESTS
+
+
+def test_merge_equals_adding_everything_to_one():
+    samples = [answer(200, 5.0 + i) for i in range(30)] + [answer(500), answer(429)]
+    first, second, combined = LoadStats(), LoadStats(), LoadStats()
+    for i, sample in enumerate(samples):
+        (first if i % 2 else second).add(sample)
+        combined.add(sample)
+    first.merge(second)
+    for name in ("requests", "errors", "throttled", "elapsed_ms", "phase_count"):
+        assert getattr(first, name) == getattr(combined, name)
+    assert list(first.latency.counts) == list(combined.latency.counts)
+    assert first.error_rate == combined.error_rate
+
+
+def test_split_shares_the_whole_rate():
+    for total in (2, 3, 100):
+        parts = LoadConfig(workers=8, total_requests=total, target_rps=60, processes=4).split()
+        assert sum(p.total_requests for p in parts) == total
+        assert sum(p.target_rps for p in parts) == 60
+        assert sum(p.workers for p in parts) == 8
+        assert all(p.total_requests for p in parts)
@@ -0,0 +1,25 @@
+import socket
+
+import phase_timing
+from mock_server import MockServer
+from probe_engine import ProbeEngine
+
+
+def test_falls_back_to_the_next_resolved_address(monkeypatch):
+    real_getaddrinfo = socket.getaddrinfo
+
+    def dual_stack(host, port, family=0, type=0, *args):
+        # A dead address first, as with an unreachable IPv6 record ahead of a working IPv4 one
+        if host == "dual.test":
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.2", port)),
+                    (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+        return real_getaddrinfo(host, port, family, type, *args)
+
+    monkeypatch.setattr(phase_timing.socket, "getaddrinfo", dual_stack)
+    with MockServer() as server:
+        port = server.httpd.server_address[1]
+        engine = ProbeEngine()
+        result = engine.probe(f"http://dual.test:{port}/", "GET")
+        engine.close()
+    assert result.ok, result.error
+    assert result.phases["dns"] > 0
@@ -0,0 +1,53 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from rate_limit import TokenBucket, is_throttled, parse_retry_after
+
+
+def test_waiters_queued_during_a_pause_are_spaced_at_rate():
+    bucket = TokenBucket(5, burst=1)
+    bucket.acquire()
+    bucket.pause(1.0)
+    waits = [bucket._reserve() for _ in range(6)]
+    for expected, wait in zip([1.0, 1.2, 1.4, 1.6, 1.8, 2.0], waits):
+        assert abs(wait - expected) < 0.05
+
+
+def test_pause_forfeits_saved_up_burst():
+    bucket = TokenBucket(10, burst=5)
+    bucket.pause(0.5)
+    waits = [bucket._reserve() for _ in range(3)]
+    assert waits[1] - waits[0] > 0.09
+    assert waits[2] - waits[1] > 0.09
+
+
+def test_burst_without_pause():
+    bucket = TokenBucket(10, burst=3)
+    waits = [bucket._reserve() for _ in range(4)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0.09 < waits[3] <= 0.1
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470) == 10.0
+
+
+def test_only_a_503_with_retry_after_is_throttling():
+    assert is_throttled(SimpleNamespace(status_code=429, headers={}))
+    assert is_throttled(SimpleNamespace(status_code=503, headers={"Retry-After": "2"}))
+    assert not is_throttled(SimpleNamespace(status_code=503, headers={}))
+    assert not is_throttled(SimpleNamespace(status_code=500, headers={"Retry-After": "2"}))
+
+
+def test_cancel_cuts_a_pause_short():
+    bucket = TokenBucket(5, burst=1)
+    bucket.pause(5.0)
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    start = time.monotonic()
+    bucket.acquire(cancel)
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+from probe_engine import ProbeResult, latency_distribution
+from regression import compare, fisher_greater, mann_whitney_greater, percentile
+
+
+def answer(status, elapsed_ms=10.0, headers=None):
+    return ProbeResult(SimpleNamespace(status_code=status, headers=headers or {}), elapsed_ms)
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 21))
+    assert percentile(values, 50) == 10
+    assert percentile(values, 95) == 19
+    assert percentile([], 50) is None
+
+
+def test_fisher_known_p_values():
+    # Lady tasting tea: 3 of 4 right against 1 of 4, one-sided p = 17/70
+    assert abs(fisher_greater(1, 4, 3, 4) - 17 / 70) < 1e-12
+    # 0 of 10 errors before, 3 of 10 now: C(10,3) / C(20,3)
+    assert abs(fisher_greater(0, 10, 3, 10) - 120 / 1140) < 1e-12
+    assert fisher_greater(0, 10, 0, 10) == 1.0
+
+
+def test_mann_whitney_known_p_values():
+    # Fully separated samples of 3: U = 9, z = (9 - 4.5 - 0.5) / sqrt(5.25)
+    assert abs(mann_whitney_greater([1, 2, 3], [4, 5, 6]) - 0.040435) < 1e-5
+    assert mann_whitney_greater([4, 5, 6], [1, 2, 3]) > 0.95
+    assert mann_whitney_greater(list(range(10)), list(range(10))) > 0.5
+    assert mann_whitney_greater([], [1]) == 1.0
+
+
+def test_slower_run_regresses_p50():
+    baseline = {"latencies": [100 + i for i in range(20)], "errors": 0, "requests": 20}
+    current = {"latencies": [150 + i for i in range(20)], "errors": 0, "requests": 20}
+    checks = {c.metric: c for c in compare("u", "GET", baseline, current).checks}
+    assert checks["p50"].regressed
+    assert not checks["error rate"].regressed
+    assert not compare("u", "GET", baseline, baseline).regressed
+
+
+def test_server_errors_regress_error_rate():
+    baseline = latency_distribution([answer(200, 100 + i) for i in range(20)])
+    for status, headers in [(500, None), (503, None)]:
+        current = latency_distribution([answer(status, headers=headers) for _ in range(20)])
+        assert current["errors"] == 20
+        comparison = compare("u", "GET", baseline, current)
+        assert comparison.regressed
+        assert [c.metric for c in comparison.checks if c.regressed] == ["error rate"]
+
+
+def test_fully_throttled_run_is_inconclusive():
+    baseline = latency_distribution([answer(200) for _ in range(20)])
+    current = latency_distribution([answer(503, headers={"Retry-After": "1"}) for _ in range(5)])
+    assert current["requests"] == 0
+    comparison = compare("u", "GET", baseline, current)
+    assert comparison.inconclusive and not comparison.regressed
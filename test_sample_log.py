@@ -0,0 +1,66 @@
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+from sample_log import SampleLog
+
+
+def fake_result(status=200, elapsed_ms=12.5):
+    return SimpleNamespace(ok=True, response=SimpleNamespace(status_code=status), elapsed_ms=elapsed_ms,
+                           bytes_read=512, error=None)
+
+
+def log_files(path):
+    return [p for p in [path] + [f"{path}.{n}" for n in range(1, 10)] if os.path.exists(p)]
+
+
+def test_rotates_while_queue_never_empties(tmp_path):
+    path = str(tmp_path / "s.jsonl")
+    log = SampleLog(path, max_bytes=2000, backups=3)
+    for _ in range(300):
+        log.log("http://example.test/items", "GET", fake_result())
+    log.close()
+    files = log_files(path)
+    assert len(files) == 4
+    # A file only passes max_bytes by the one record that tipped it over
+    assert all(os.path.getsize(p) < 2000 + 200 for p in files)
+    assert log.written == 300
+
+
+def test_rotates_under_concurrent_logging(tmp_path):
+    path = str(tmp_path / "s.jsonl")
+    log = SampleLog(path, max_bytes=20_000, backups=2)
+
+    def worker():
+        for _ in range(2000):
+            log.log("http://example.test/items", "GET", fake_result())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    log.close()
+    assert log_files(path) == [path, f"{path}.1", f"{path}.2"]
+    assert all(os.path.getsize(p) < 20_000 + 200 for p in log_files(path))
+    with open(path, encoding="utf-8") as f:
+        assert all(json.loads(line)["status"] == 200 for line in f)
+
+
+def test_size_counts_bytes_not_characters(tmp_path):
+    path = str(tmp_path / "s.csv")
+    with SampleLog(path, max_bytes=10 ** 6) as log:
+        log.log("http://example.test/café/日本", "GET", fake_result())
+    assert log._size == os.path.getsize(path)
+
+
+def test_csv_parts_each_get_a_header(tmp_path):
+    path = str(tmp_path / "s.csv")
+    log = SampleLog(path, max_bytes=500, backups=2)
+    for _ in range(50):
+        log.log("http://example.test/items", "GET", fake_result())
+    log.close()
+    for p in log_files(path):
+        with open(p, encoding="utf-8") as f:
+            assert f.readline().startswith("ts,url,method")
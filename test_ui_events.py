@@ -0,0 +1,51 @@
+from ui_events import EventPump
+
+
+class FakeWidget:
+    def __init__(self):
+        self.scheduled = []
+        self.reported = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def report_callback_exception(self, *exc_info):
+        self.reported.append(exc_info[1])
+
+
+def broken(payloads):
+    raise ImportError("No module named 'matplotlib'")
+
+
+def test_a_failing_handler_neither_stops_the_pump_nor_later_events():
+    widget = FakeWidget()
+    done = []
+    errors = []
+    pump = EventPump(widget, {"scores": broken, "done": done.extend}, on_error=lambda kind, exc: errors.append(kind))
+    pump.post("scores", [1, 2, 3, 4])
+    pump.post("done", "finished")
+    pump.start()
+    assert done == ["finished"]
+    assert errors == ["scores"]
+    assert len(widget.scheduled) == 1
+
+
+def test_errors_go_to_tk_without_a_handler():
+    widget = FakeWidget()
+    pump = EventPump(widget, {"scores": broken})
+    pump.post("scores", [1])
+    pump.start()
+    assert isinstance(widget.reported[0], ImportError)
+    assert len(widget.scheduled) == 1
+
+
+def test_same_kind_events_arrive_as_one_batch():
+    widget = FakeWidget()
+    batches = []
+    pump = EventPump(widget, {"report": batches.append, "done": batches.append})
+    for line in "abc":
+        pump.post("report", line)
+    pump.post("done")
+    pump.post("report", "d")
+    pump.start()
+    assert batches == [["a", "b", "c"], [None], ["d"]]
@@ -0,0 +1,83 @@
+import queue
+import sys
+import tkinter as tk
+
+
+class EventPump:
+    """Hands events from worker threads to the Tk main loop.
+
+    Workers call post() from any thread; the pump drains the queue on a Tk
+    timer and calls ``handlers[kind](payloads)`` on the main thread.
+    Consecutive events of the same kind are delivered together, so a burst
+    of log lines or latency samples costs one widget update, not one each.
+    A handler that raises doesn't stop the pump or the events after it: the
+    error goes to ``on_error(kind, exc)``, or Tk's report_callback_exception
+    when none is given.
+    """
+
+    def __init__(self, widget, handlers, interval_ms=50, max_batch=1000, on_error=None):
+        self.widget = widget
+        self.handlers = handlers
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+        self.on_error = on_error
+        self.events = queue.SimpleQueue()
+
+    def post(self, kind, payload=None):
+        self.events.put((kind, payload))
+
+    def start(self):
+        self._drain()
+
+    def _deliver(self, kind, payloads):
+        try:
+            self.handlers[kind](payloads)
+        except Exception as exc:
+            if self.on_error:
+                self.on_error(kind, exc)
+            else:
+                self.widget.report_callback_exception(*sys.exc_info())
+
+    def _drain(self):
+        try:
+            batch = []
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self.events.get_nowait())
+            except queue.Empty:
+                pass
+
+            run_kind, run = None, []
+            for kind, payload in batch:
+                if kind != run_kind and run:
+                    self._deliver(run_kind, run)
+                    run = []
+                run_kind = kind
+                run.append(payload)
+            if run:
+                self._deliver(run_kind, run)
+        finally:
+            # Keep pumping whatever happened, or a later "done" event would never arrive
+            self.widget.after(self.interval_ms, self._drain)
+
+
+class BoundedLog:
+    """Keeps a Text widget to its last ``max_lines`` lines.
+
+    Appends are written in one insert and scrolled once; when the widget
+    grows past the limit the oldest lines are dropped from the top.
+    """
+
+    def __init__(self, text_widget, max_lines=2000):
+        self.text = text_widget
+        self.max_lines = max_lines
+
+    def append(self, chunks):
+        self.text.insert(tk.END, "".join(chunks))
+        lines = int(self.text.index("end-1c").split(".")[0])
+        if lines > self.max_lines:
+            self.text.delete("1.0", f"{lines - self.max_lines + 1}.0")
+        self.text.see(tk.END)
+
+    def clear(self):
+        self.text.delete("1.0", tk.END)